@@ -0,0 +1,239 @@
+"""Microbenchmarks for the auth code that runs on every request.
+
+Each piece (token encode/decode, safe tokens, TokenBearer, RoleChecker) is
+timed in isolation, then the whole dependency chain is driven end to end
+through a FastAPI route. Redis is replaced by fakeredis; the database is
+DATABASE_URL, so point it at a disposable local Postgres.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.auth_hot_path --save benchmarks/baseline.json
+    python -m benchmarks.auth_hot_path --compare benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+import uuid
+
+import fakeredis
+
+import src.db.redis as redis_store
+
+# Every module reads the client off src.db.redis when it uses it, so this
+# swaps Redis out everywhere
+redis_store.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlmodel import delete  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from src.auth.dependencies import (  # noqa: E402
+    Principal,
+    RoleChecker,
+    access_token_bearer,
+)
+from src.auth.schema import UserAuthModal  # noqa: E402
+from src.auth.utils import (  # noqa: E402
+    create_access_token,
+    create_safe_token,
+    decode_safe_token,
+    decode_token,
+    token_claims_cache,
+)
+from src.db.main import engine, init_db  # noqa: E402
+from src.db.models import User  # noqa: E402
+
+user_checker = RoleChecker(["user", "admin"])
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/protected", dependencies=[Depends(user_checker)])
+async def protected(token_data: dict = Depends(access_token_bearer)):
+    return {"ok": True}
+
+
+def bearer_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+async def measure(fn, iterations: int) -> dict:
+    # Warm up, then time and count allocations in separate passes so
+    # tracemalloc overhead does not skew ops/sec
+    for _ in range(min(iterations, 100)):
+        await fn()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    elapsed = time.perf_counter() - start
+
+    alloc_iterations = max(1, iterations // 10)
+    peak_total = 0
+    tracemalloc.start()
+    for _ in range(alloc_iterations):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        await fn()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - current
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": iterations / elapsed,
+        "us_per_op": elapsed / iterations * 1e6,
+        "peak_bytes_per_op": peak_total / alloc_iterations,
+    }
+
+
+def as_async(fn):
+    async def run():
+        return fn()
+
+    return run
+
+
+async def seed_user(Session) -> User:
+    suffix = uuid.uuid4().hex[:8]
+    async with Session() as session:
+        user = User(
+            username=f"bench_{suffix}",
+            email=f"bench_{suffix}@example.com",
+            firstname="Bench",
+            lastname="Mark",
+            role="user",
+            is_verified=True,
+            password_hash=f"bench-{suffix}",
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+async def run_benchmarks(iterations: int) -> dict:
+    engine.echo = False
+    await init_db()
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    user = await seed_user(Session)
+
+    user_claims = {
+        "email": user.email,
+        "user_uid": str(user.uid),
+        "role": user.role,
+        "is_verified": user.is_verified,
+        "version": await redis_store.ensure_user_version(str(user.uid)),
+        "generation": 0,
+    }
+    token = create_access_token(user_data=user_claims)
+    safe_token = create_safe_token({"email": user.email})
+    principal = Principal(
+        token_data={"jti": "bench", "user": user_claims},
+        user=UserAuthModal(
+            uid=user.uid, email=user.email, role=user.role, is_verified=True
+        ),
+    )
+
+    async def bearer_cold():
+        token_claims_cache.clear()
+        await access_token_bearer(bearer_request(token))
+
+    async def bearer_warm():
+        await access_token_bearer(bearer_request(token))
+
+    transport = httpx.ASGITransport(app=bench_app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+
+        async def full_chain():
+            response = await http.get("/protected", headers=headers)
+            assert response.status_code == 200, response.text
+
+        cases = {
+            "create_access_token": as_async(
+                lambda: create_access_token(user_data=user_claims)
+            ),
+            "decode_token": as_async(lambda: decode_token(token)),
+            "create_safe_token": as_async(
+                lambda: create_safe_token({"email": user.email})
+            ),
+            "decode_safe_token": as_async(lambda: decode_safe_token(safe_token)),
+            "token_bearer_cold": bearer_cold,
+            "token_bearer_warm": bearer_warm,
+            "role_checker": as_async(lambda: user_checker(principal)),
+            "full_chain": full_chain,
+        }
+
+        results = {}
+        try:
+            for name, fn in cases.items():
+                results[name] = await measure(fn, iterations)
+        finally:
+            async with Session() as session:
+                await session.exec(delete(User).where(User.uid == user.uid))
+                await session.commit()
+            await engine.dispose()
+    return results
+
+
+def report(results: dict, baseline: dict = None, threshold: float = 10.0) -> bool:
+    regressed = False
+    header = f"{'case':<22} | {'ops/sec':>10} | {'us/op':>9} | {'peak B/op':>9}"
+    if baseline:
+        header += f" | {'vs base':>8}"
+    print(header)
+    for name, result in results.items():
+        line = (
+            f"{name:<22} | {result['ops_per_sec']:>10.0f} | "
+            f"{result['us_per_op']:>9.1f} | {result['peak_bytes_per_op']:>9.0f}"
+        )
+        if baseline and name in baseline:
+            change = (result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1) * 100
+            line += f" | {change:>+7.1f}%"
+            if change < -threshold:
+                line += "  REGRESSION"
+                regressed = True
+        print(line)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--save", help="Write results to this baseline file")
+    parser.add_argument("--compare", help="Compare against this baseline file")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed ops/sec drop in %%"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.iterations))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    regressed = report(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+    if regressed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
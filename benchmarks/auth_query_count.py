@@ -0,0 +1,117 @@
+"""Count the SQL statements auth issues per request as a user's library grows.
+
+The user cache is emptied before every round, so each lookup reaches the
+database. Runs against DATABASE_URL, so point it at a disposable database:
+
+    python -m benchmarks.auth_query_count
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.cache import user_cache
+from src.auth.service import UserService
+from src.db.main import engine, init_db
+from src.db.models import Book, User
+
+LIBRARY_SIZES = [0, 10, 100, 1000, 5000]
+ROUNDS = 50
+
+user_service = UserService()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def add_books(session: AsyncSession, user: User, start: int, stop: int):
+    for i in range(start, stop):
+        session.add(
+            Book(
+                Title=f"Benchmark Book {i}",
+                Author="Benchmark Author",
+                Publication_Year=date(2000, 1, 1),
+                Genre=["Benchmark"],
+                user_uid=user.uid,
+            )
+        )
+    await session.commit()
+
+
+async def measure(Session, email: str, load) -> tuple:
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            user_cache.local.clear()
+            user_cache.invalidated.clear()
+            async with Session() as session:
+                await load(email, session)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+    return counter.count / ROUNDS, elapsed / ROUNDS * 1000
+
+
+async def main():
+    engine.echo = False
+    await init_db()
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    suffix = uuid.uuid4().hex[:8]
+    async with Session() as session:
+        user = User(
+            username=f"bench_{suffix}",
+            email=f"bench_{suffix}@example.com",
+            firstname="Bench",
+            lastname="Mark",
+            role="user",
+            is_verified=True,
+            password_hash=f"bench-{suffix}",
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+
+    async def full_user(email, session):
+        return await user_service.get_user(email, session, load_library=True)
+
+    print(
+        f"{'books':>6} | {'auth stmts':>10} | {'auth ms':>8} | {'full stmts':>10} | {'full ms':>8}"
+    )
+    owned = 0
+    try:
+        for size in LIBRARY_SIZES:
+            async with Session() as session:
+                await add_books(session, user, owned, size)
+            owned = size
+
+            auth_stmts, auth_ms = await measure(
+                Session, user.email, user_service.get_auth_user
+            )
+            full_stmts, full_ms = await measure(Session, user.email, full_user)
+            print(
+                f"{size:>6} | {auth_stmts:>10.1f} | {auth_ms:>8.2f} | "
+                f"{full_stmts:>10.1f} | {full_ms:>8.2f}"
+            )
+    finally:
+        async with Session() as session:
+            await session.exec(delete(User).where(User.uid == user.uid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""Cost of BooksService.get_book_detail from each cache tier.
+
+Seeds a book with reviews and tags, then times the detail read (median of
+many runs) and counts the SQL statements it issues: served from the worker's
+LRU, from the Redis tier after the LRU was cleared, and from the database
+after an invalidation. Redis is replaced by fakeredis; the database is
+DATABASE_URL with the migrations applied:
+
+    python -m benchmarks.book_detail_cache --reviews 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date
+
+import fakeredis
+
+import src.db.redis as redis_store
+
+# Every module reads the client off src.db.redis when it uses it, so this
+# swaps Redis out everywhere
+redis_store.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import delete  # noqa: E402
+
+from src.books.cache import book_detail_cache  # noqa: E402
+from src.books.service import BooksService  # noqa: E402
+from src.db.main import Session, engine  # noqa: E402
+from src.db.models import Book, BookTag, Review, Tag, User  # noqa: E402
+
+book_service = BooksService()
+
+
+async def seed(reviews: int, tags: int):
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"detail_{suffix}",
+        email=f"detail_{suffix}@example.com",
+        firstname="Detail",
+        lastname="Bench",
+        role="user",
+        is_verified=True,
+        password_hash=f"detail-{suffix}",
+    )
+    tag_rows = [Tag(name=f"detail-{suffix}-{n}") for n in range(tags)]
+    async with Session() as session:
+        session.add_all([user, *tag_rows])
+        await session.flush()
+        book = Book(
+            Title=f"Detail {suffix}",
+            Author="Detail Author",
+            Publication_Year=date(2000, 1, 1),
+            Genre=["Detail"],
+            user_uid=user.uid,
+        )
+        session.add(book)
+        await session.flush()
+        session.add_all(
+            [
+                Review(
+                    rating=1 + n % 5,
+                    review_text=f"review {n}",
+                    user_uid=user.uid,
+                    book_uid=book.uid,
+                )
+                for n in range(reviews)
+            ]
+            + [BookTag(book_uid=book.uid, tag_uid=tag.uid) for tag in tag_rows]
+        )
+        await session.commit()
+        return user.uid, str(book.uid), [tag.uid for tag in tag_rows]
+
+
+async def timed(book_uid: str, runs: int, before=None):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    samples = []
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        for _ in range(runs):
+            if before is not None:
+                await before()
+            async with Session() as session:
+                started = time.perf_counter()
+                await book_service.get_book_detail(book_uid, session)
+                samples.append((time.perf_counter() - started) * 1e6)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return statistics.median(samples), len(statements) / runs
+
+
+async def main(reviews: int, tags: int, runs: int) -> None:
+    engine.echo = False
+    user_uid, book_uid, tag_uids = await seed(reviews, tags)
+
+    async def clear_local():
+        book_detail_cache.local.clear()
+
+    async def invalidate():
+        await book_detail_cache.invalidate(book_uid)
+
+    try:
+        await book_detail_cache.invalidate(book_uid)
+        tiers = [
+            ("database", invalidate),
+            ("redis", clear_local),
+            ("local", None),
+        ]
+        for name, before in tiers:
+            elapsed_us, per_call = await timed(book_uid, runs, before)
+            print(f"{name:<9} {elapsed_us:10.1f} us  {per_call:.1f} statements")
+    finally:
+        async with Session() as session:
+            await session.exec(delete(BookTag).where(BookTag.tag_uid.in_(tag_uids)))
+            await session.exec(delete(Tag).where(Tag.uid.in_(tag_uids)))
+            await session.exec(delete(User).where(User.uid == user_uid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.reviews, args.tags, args.runs))
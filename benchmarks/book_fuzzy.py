@@ -0,0 +1,119 @@
+"""Latency of BooksService.fuzzy_books on a large generated catalog.
+
+Seeds books whose authors pair a first name with one of a fixed list of
+surnames, then times misspelled lookups (median of several runs) at a few
+similarity thresholds. Runs against DATABASE_URL with the migrations applied:
+
+    python -m benchmarks.book_fuzzy --books 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlmodel import delete
+
+from src.books.service import BooksService
+from src.db.main import Session, engine
+from src.db.models import User
+
+book_service = BooksService()
+
+# Surnames are drawn skewed towards the start of the list, so "Smith" is
+# common and "Dostoevsky" rare
+SEED_BOOKS = text(
+    """
+    WITH vocabulary AS (
+        SELECT ARRAY[
+            'Smith', 'Johnson', 'Williams', 'Brown', 'Garcia', 'Miller',
+            'Anderson', 'Thompson', 'Fitzgerald', 'Hemingway', 'Melville',
+            'Salinger', 'Tolkien', 'Orwell', 'Tolstoy', 'Dostoevsky'
+        ] AS surnames,
+        ARRAY[
+            'Anna', 'Leo', 'Fyodor', 'Jane', 'George', 'Harper', 'Herman',
+            'Scott'
+        ] AS firsts,
+        ARRAY[
+            'night', 'river', 'garden', 'empire', 'shadow', 'winter', 'silent',
+            'glass', 'harbor', 'orchard', 'lantern', 'meridian'
+        ] AS words
+    )
+    INSERT INTO books
+        (uid, "Title", "Author", "Publication_Year", user_uid, "Genre",
+         created_at, updated_at)
+    SELECT gen_random_uuid(),
+           words[1 + floor(12 * random())::int] || ' ' ||
+           words[1 + floor(12 * random())::int] || ' ' || n,
+           firsts[1 + floor(8 * random())::int] || ' ' ||
+           surnames[1 + floor(16 * random() ^ 2)::int],
+           DATE '2000-01-01', :user_uid, ARRAY['Fuzzy'], now(), now()
+    FROM generate_series(1, :count) AS n, vocabulary
+    """
+)
+
+QUERIES = ["Dostoevski", "Tolstoi", "Hemmingway", "Smyth", "lanturn"]
+THRESHOLDS = [0.4, 0.6, 0.8]
+
+
+async def seed(count: int) -> uuid.UUID:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"fuzzy_{suffix}",
+        email=f"fuzzy_{suffix}@example.com",
+        firstname="Fuzzy",
+        lastname="Bench",
+        role="user",
+        is_verified=True,
+        password_hash=f"fuzzy-{suffix}",
+    )
+    async with Session() as session:
+        session.add(user)
+        await session.flush()
+        await session.exec(SEED_BOOKS.bindparams(user_uid=user.uid, count=count))
+        await session.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE books")
+    return user.uid
+
+
+async def timed(query: str, threshold: float, limit: int, runs: int):
+    samples = []
+    for _ in range(runs):
+        async with Session() as session:
+            started = time.perf_counter()
+            books = await book_service.fuzzy_books(query, session, threshold, limit)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), books
+
+
+async def main(count: int, runs: int, limit: int) -> None:
+    engine.echo = False
+    started = time.perf_counter()
+    user_uid = await seed(count)
+    print(f"seeded {count} books in {time.perf_counter() - started:.1f}s")
+    try:
+        for query in QUERIES:
+            for threshold in THRESHOLDS:
+                elapsed_ms, books = await timed(query, threshold, limit, runs)
+                closest = books[0].Author if books else "-"
+                print(
+                    f"{query!r:<14} threshold {threshold:.1f} {elapsed_ms:8.2f} ms  "
+                    f"{len(books):>3} results, closest {closest!r}"
+                )
+    finally:
+        async with Session() as session:
+            await session.exec(delete(User).where(User.uid == user_uid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.books, args.runs, args.limit))
@@ -0,0 +1,103 @@
+"""Bulk book import throughput, in books per minute.
+
+Builds an NDJSON body of generated books, runs it through the same parser and
+BooksService.import_books the /book/import_books route uses, then imports it
+again with on_conflict=upsert so the conflict path is timed too. Redis is
+replaced by fakeredis; the database is DATABASE_URL:
+
+    python -m benchmarks.book_import --books 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import fakeredis
+
+import src.db.redis as redis_store
+
+# Every module reads the client off src.db.redis when it uses it, so this
+# swaps Redis out everywhere
+redis_store.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+from sqlmodel import delete  # noqa: E402
+
+from src.books.service import BooksService, parse_book_records  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.db.main import Session, engine  # noqa: E402
+from src.db.models import User  # noqa: E402
+
+book_service = BooksService()
+
+
+def build_body(count: int) -> bytes:
+    return "".join(
+        json.dumps(
+            {
+                "Title": f"Import {n}",
+                "Author": f"Author {n % 1000}",
+                "Publication_Year": "2000-01-01",
+                "Genre": ["Import", "Benchmark"],
+            }
+        )
+        + "\n"
+        for n in range(count)
+    ).encode()
+
+
+async def create_user() -> uuid.UUID:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"import_{suffix}",
+        email=f"import_{suffix}@example.com",
+        firstname="Import",
+        lastname="Bench",
+        role="user",
+        is_verified=True,
+        password_hash=f"import-{suffix}",
+    )
+    async with Session() as session:
+        session.add(user)
+        await session.commit()
+        return user.uid
+
+
+async def run(body: bytes, user_uid, on_conflict: str) -> None:
+    started = time.perf_counter()
+    records = parse_book_records(body, "application/x-ndjson")
+    async with Session() as session:
+        result = await book_service.import_books(
+            records, str(user_uid), on_conflict, session
+        )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{on_conflict:<7} {len(records):>8} rows {elapsed:>7.2f}s "
+        f"{len(records) / elapsed * 60:>10.0f} books/min  "
+        f"inserted={result.inserted} updated={result.updated} "
+        f"skipped={result.skipped} failed={result.failed}"
+    )
+
+
+async def main(count: int) -> None:
+    engine.echo = False
+    print(f"BOOK_IMPORT_BATCH_SIZE={settings.BOOK_IMPORT_BATCH_SIZE}")
+    body = build_body(count)
+    user_uid = await create_user()
+    try:
+        await run(body, user_uid, "skip")
+        await run(body, user_uid, "skip")
+        await run(body, user_uid, "upsert")
+    finally:
+        async with Session() as session:
+            await session.exec(delete(User).where(User.uid == user_uid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(main(args.books))
@@ -0,0 +1,119 @@
+"""Latency of BooksService.search_books on a large generated catalog.
+
+Seeds books whose titles and authors are drawn from a fixed vocabulary, so
+some terms are common and others rare, then times each query (median of
+several runs) for the first page and for a page reached through cursors.
+Runs against DATABASE_URL with the migrations applied:
+
+    python -m benchmarks.book_search --books 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlmodel import delete
+
+from src.books.service import BooksService
+from src.db.main import Session, engine
+from src.db.models import User
+from src.pagination import PageParams, decode_cursor
+
+book_service = BooksService()
+
+# Words are drawn skewed towards the start of the list, so "night" is common
+# and "labyrinth" rare
+SEED_BOOKS = text(
+    """
+    WITH vocabulary AS (
+        SELECT ARRAY[
+            'night', 'river', 'garden', 'empire', 'shadow', 'winter', 'silent',
+            'glass', 'harbor', 'orchard', 'lantern', 'meridian', 'quixotic',
+            'zephyr', 'obsidian', 'labyrinth'
+        ] AS words
+    )
+    INSERT INTO books
+        (uid, "Title", "Author", "Publication_Year", user_uid, "Genre",
+         created_at, updated_at)
+    SELECT gen_random_uuid(),
+           words[1 + floor(16 * random() ^ 3)::int] || ' ' ||
+           words[1 + floor(16 * random() ^ 3)::int] || ' ' || n,
+           'Author ' || words[1 + floor(16 * random() ^ 2)::int] || ' ' || (n % 5000),
+           DATE '2000-01-01', :user_uid, ARRAY['Search'], now(), now()
+    FROM generate_series(1, :count) AS n, vocabulary
+    """
+)
+
+QUERIES = ["night", "garden river", "labyrinth", "obsidian zephyr", '"silent glass"']
+
+
+async def seed(count: int) -> uuid.UUID:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"search_{suffix}",
+        email=f"search_{suffix}@example.com",
+        firstname="Search",
+        lastname="Bench",
+        role="user",
+        is_verified=True,
+        password_hash=f"search-{suffix}",
+    )
+    async with Session() as session:
+        session.add(user)
+        await session.flush()
+        await session.exec(SEED_BOOKS.bindparams(user_uid=user.uid, count=count))
+        await session.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE books")
+    return user.uid
+
+
+async def timed(query: str, page: PageParams, runs: int):
+    samples = []
+    for _ in range(runs):
+        async with Session() as session:
+            started = time.perf_counter()
+            result = await book_service.search_books(query, session, page)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+async def main(count: int, runs: int, pages: int, limit: int) -> None:
+    engine.echo = False
+    started = time.perf_counter()
+    user_uid = await seed(count)
+    print(f"seeded {count} books in {time.perf_counter() - started:.1f}s")
+    try:
+        for query in QUERIES:
+            page = PageParams(limit=limit)
+            timings = []
+            for _ in range(pages):
+                elapsed_ms, result = await timed(query, page, runs)
+                timings.append(elapsed_ms)
+                if result["next_cursor"] is None:
+                    break
+                page = PageParams(
+                    limit=limit, after=decode_cursor(result["next_cursor"], float)
+                )
+            print(
+                f"{query!r:<22} page 1 {timings[0]:8.2f} ms  "
+                f"page {len(timings)} {timings[-1]:8.2f} ms"
+            )
+    finally:
+        async with Session() as session:
+            await session.exec(delete(User).where(User.uid == user_uid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.books, args.runs, args.pages, args.limit))
@@ -0,0 +1,58 @@
+"""Measure bcrypt cost on this host and recommend PASSWORD_HASH_ROUNDS.
+
+    python -m benchmarks.calibrate_password_hash --target-ms 250
+
+Each extra round doubles hashing time, so pick the highest cost whose median
+hash time still fits the login latency budget.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    recommended = args.min_rounds
+    print(
+        f"{'rounds':>6} | {'median ms':>9} | {'logins/s/core':>13} | {'logins/s/node':>13}"
+    )
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        median_ms = time_rounds(rounds, args.samples)
+        per_core = 1000 / median_ms
+        print(
+            f"{rounds:>6} | {median_ms:>9.1f} | {per_core:>13.1f} | "
+            f"{per_core * cores:>13.1f}"
+        )
+        if median_ms > args.target_ms:
+            break
+        recommended = rounds
+
+    print(
+        f"\nRecommended PASSWORD_HASH_ROUNDS={recommended} "
+        f"for a {args.target_ms:.0f} ms target on {cores} cores"
+    )
+
+
+if __name__ == "__main__":
+    main()
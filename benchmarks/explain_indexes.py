@@ -0,0 +1,223 @@
+"""Check that each service query is planned on the index meant for it.
+
+Seeds a few rows, runs the service methods while capturing the SQL they emit,
+then EXPLAINs that SQL with sequential scans disabled, so the check does not
+depend on table size. Runs against DATABASE_URL with the migrations applied:
+
+    python -m benchmarks.explain_indexes
+"""
+
+import asyncio
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlmodel import delete
+
+from src.auth.service import UserService
+from src.books.service import BooksService, GenreFilter
+from src.db.main import Session, engine
+from src.db.models import Book, BookTag, Review, Tag, User
+from src.pagination import PageParams
+from src.reviews.service import ReviewService
+from src.tags.service import TagService
+
+user_service = UserService()
+book_service = BooksService()
+review_service = ReviewService()
+tag_service = TagService()
+
+# (query, service call, fragment identifying the statement, expected index)
+CASES = [
+    (
+        "BooksService.get_all_books",
+        lambda session, seed: book_service.get_all_books(session),
+        "FROM books",
+        "ix_books_created_at_uid",
+    ),
+    (
+        "BooksService.get_all_books after cursor",
+        lambda session, seed: book_service.get_all_books(session, seed.page),
+        "FROM books",
+        "ix_books_created_at_uid",
+    ),
+    (
+        "BooksService.get_user_books after cursor",
+        lambda session, seed: book_service.get_user_books(
+            seed.user_uid, session, seed.page
+        ),
+        "FROM books",
+        "ix_books_user_uid_created_at_uid",
+    ),
+    (
+        "BooksService.get_all_books by genre",
+        lambda session, seed: book_service.get_all_books(
+            session, genres=GenreFilter(all_of=["Explain"])
+        ),
+        "FROM books",
+        "ix_books_genre",
+    ),
+    (
+        "BooksService.search_books",
+        lambda session, seed: book_service.search_books("explain", session),
+        "FROM books",
+        "ix_books_search_vector",
+    ),
+    (
+        "BooksService.fuzzy_books",
+        lambda session, seed: book_service.fuzzy_books("Explian Autor", session),
+        "FROM books",
+        "ix_books_author_trgm",
+    ),
+    (
+        "BooksService.get_single_book reviews",
+        lambda session, seed: book_service.get_single_book(seed.book_uid, session),
+        "FROM reviews",
+        "ix_reviews_book_uid_created_at",
+    ),
+    (
+        "UserService.get_user reviews",
+        lambda session, seed: user_service.get_user(
+            seed.email, session, load_library=True
+        ),
+        "FROM reviews",
+        "ix_reviews_user_uid",
+    ),
+    (
+        "ReviewService.get_all_reviews after cursor",
+        lambda session, seed: review_service.get_all_reviews(session, seed.page),
+        "FROM reviews",
+        "ix_reviews_created_at_uid",
+    ),
+    (
+        "TagService.get_all_tags after cursor",
+        lambda session, seed: tag_service.get_all_tags(session, seed.page),
+        "FROM tag",
+        "ix_tag_created_at_uid",
+    ),
+    (
+        "TagService.get_single_tag",
+        lambda session, seed: tag_service.get_single_tag(seed.tag_name, session),
+        "FROM tag",
+        "ix_tag_lower_name",
+    ),
+    (
+        "TagService.suggest_tags",
+        lambda session, seed: tag_service.suggest_tags("explain-", session),
+        "FROM tag",
+        "ix_tag_lower_name",
+    ),
+    # Deletes the seeded tag, so it runs last
+    (
+        "TagService.delete_tag links",
+        lambda session, seed: tag_service.delete_tag(seed.tag_uid, session),
+        "FROM booktag",
+        "ix_booktag_tag_uid",
+    ),
+]
+
+
+async def seed_rows(session) -> SimpleNamespace:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"explain_{suffix}",
+        email=f"explain_{suffix}@example.com",
+        firstname="Explain",
+        lastname="Check",
+        role="user",
+        is_verified=True,
+        password_hash=f"explain-{suffix}",
+    )
+    tag = Tag(name=f"explain-{suffix}")
+    session.add_all([user, tag])
+    await session.flush()
+
+    book = Book(
+        Title=f"Explain {suffix}",
+        Author="Explain Author",
+        Publication_Year=date(2000, 1, 1),
+        Genre=["Explain"],
+        user_uid=user.uid,
+    )
+    session.add(book)
+    await session.flush()
+
+    session.add_all(
+        [
+            Review(
+                rating=5, review_text="explain", user_uid=user.uid, book_uid=book.uid
+            ),
+            BookTag(book_uid=book.uid, tag_uid=tag.uid),
+        ]
+    )
+    await session.commit()
+    return SimpleNamespace(
+        user_uid=str(user.uid),
+        email=user.email,
+        book_uid=str(book.uid),
+        tag_uid=tag.uid,
+        tag_name=tag.name,
+        # A cursor a long way into the lists
+        page=PageParams(limit=10, after=(datetime(2000, 1, 1), uuid.uuid4())),
+    )
+
+
+async def capture_statement(call, seed, fragment: str):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with Session() as session:
+            await call(session, seed)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    for statement, parameters in statements:
+        if fragment in statement:
+            return statement, parameters
+    return None, None
+
+
+async def explain(statement: str, parameters) -> str:
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in result)
+
+
+async def main() -> bool:
+    engine.echo = False
+    async with Session() as session:
+        seed = await seed_rows(session)
+
+    failed = False
+    try:
+        for name, call, fragment, index in CASES:
+            statement, parameters = await capture_statement(call, seed, fragment)
+            if statement is None:
+                print(f"FAIL {name}: no statement matching {fragment!r}")
+                failed = True
+                continue
+            plan = await explain(statement, parameters)
+            if index in plan:
+                print(f"ok   {name}: {index}")
+            else:
+                print(f"FAIL {name}: expected {index}\n{plan}")
+                failed = True
+    finally:
+        async with Session() as session:
+            await session.exec(delete(BookTag).where(BookTag.tag_uid == seed.tag_uid))
+            await session.exec(delete(Tag).where(Tag.uid == seed.tag_uid))
+            await session.exec(delete(User).where(User.uid == seed.user_uid))
+            await session.commit()
+        await engine.dispose()
+    return failed
+
+
+if __name__ == "__main__":
+    if asyncio.run(main()):
+        raise SystemExit(1)
@@ -0,0 +1,91 @@
+"""Peak Python memory of the NDJSON book export at growing table sizes.
+
+Seeds books with INSERT ... SELECT generate_series, drains the same stream the
+/books/export route serves and records the tracemalloc peak. A flat peak across
+sizes means the export holds one batch at a time. Runs against DATABASE_URL:
+
+    python -m benchmarks.export_memory --sizes 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import text
+from sqlmodel import delete
+
+from src.books.service import BooksService
+from src.config import settings
+from src.db.main import Session, engine
+from src.db.models import User
+
+book_service = BooksService()
+
+SEED_BOOKS = text(
+    """
+    INSERT INTO books
+        (uid, "Title", "Author", "Publication_Year", user_uid, "Genre",
+         created_at, updated_at)
+    SELECT gen_random_uuid(), 'Export ' || n, 'Export Author', DATE '2000-01-01',
+           :user_uid, ARRAY['Export'], now(), now()
+    FROM generate_series(1, :count) AS n
+    """
+)
+
+
+async def seed(count: int) -> uuid.UUID:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"export_{suffix}",
+        email=f"export_{suffix}@example.com",
+        firstname="Export",
+        lastname="Bench",
+        role="user",
+        is_verified=True,
+        password_hash=f"export-{suffix}",
+    )
+    async with Session() as session:
+        session.add(user)
+        await session.flush()
+        await session.exec(SEED_BOOKS.bindparams(user_uid=user.uid, count=count))
+        await session.commit()
+        return user.uid
+
+
+async def measure(count: int) -> None:
+    user_uid = await seed(count)
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = size = 0
+        async for chunk in book_service.export_books(Session):
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{count:>10} seeded {rows:>10} rows {size / 2**20:>8.1f} MiB out "
+            f"{peak / 2**20:>7.2f} MiB peak {rows / elapsed:>10.0f} rows/s"
+        )
+    finally:
+        async with Session() as session:
+            await session.exec(delete(User).where(User.uid == user_uid))
+            await session.commit()
+
+
+async def main(sizes) -> None:
+    engine.echo = False
+    print(f"EXPORT_BATCH_SIZE={settings.EXPORT_BATCH_SIZE}")
+    for count in sizes:
+        await measure(count)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
@@ -0,0 +1,80 @@
+"""Latency of TagService.suggest_tags with many distinct tags.
+
+Seeds tags with random hex names, so a one-character prefix matches about a
+sixteenth of them, and skewed book counts, then times lookups (median of
+several runs) for prefixes of increasing length. Runs against DATABASE_URL
+with the migrations applied:
+
+    python -m benchmarks.tag_suggest --tags 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+
+from src.db.main import Session, engine
+from src.tags.service import TagService
+
+tag_service = TagService()
+
+# The run id suffix keeps names unique across runs and marks the rows to clean up
+SEED_TAGS = text(
+    """
+    INSERT INTO tag (uid, name, created_at, book_count)
+    SELECT gen_random_uuid(), substr(md5(n::text), 1, 10) || '-' || :run,
+           now(), floor(1000 * random() ^ 4)::int
+    FROM generate_series(1, :count) AS n
+    """
+)
+CLEANUP = text("DELETE FROM tag WHERE name LIKE '%-' || :run")
+
+PREFIXES = ["a", "a1", "a1b", "a1b2"]
+
+
+async def timed(prefix: str, limit: int, runs: int):
+    samples = []
+    for _ in range(runs):
+        async with Session() as session:
+            started = time.perf_counter()
+            tags = await tag_service.suggest_tags(prefix, session, limit)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), tags
+
+
+async def main(count: int, runs: int, limit: int) -> None:
+    engine.echo = False
+    run = uuid.uuid4().hex[:8]
+    started = time.perf_counter()
+    async with Session() as session:
+        await session.exec(SEED_TAGS.bindparams(run=run, count=count))
+        await session.commit()
+    # begin(), not connect(): the statistics roll back with the transaction
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE tag")
+    print(f"seeded {count} tags in {time.perf_counter() - started:.1f}s")
+    try:
+        for prefix in PREFIXES:
+            elapsed_ms, tags = await timed(prefix, limit, runs)
+            top = tags[0].book_count if tags else "-"
+            print(
+                f"{prefix!r:<8} {elapsed_ms:8.2f} ms  "
+                f"{len(tags):>3} results, top book_count {top}"
+            )
+    finally:
+        async with Session() as session:
+            await session.exec(CLEANUP.bindparams(run=run))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tags", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.tags, args.runs, args.limit))
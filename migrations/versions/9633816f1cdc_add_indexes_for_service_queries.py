@@ -0,0 +1,55 @@
+"""Add indexes for service queries
+
+Revision ID: 9633816f1cdc
+Revises: 24b81650a495
+Create Date: 2026-10-18 12:40:02.318113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9633816f1cdc'
+down_revision: Union[str, None] = '24b81650a495'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) for the filters and sorts the services run
+INDEXES = [
+    ('ix_books_user_uid_created_at', 'books', ['user_uid', 'created_at']),
+    ('ix_books_created_at', 'books', ['created_at']),
+    ('ix_reviews_book_uid', 'reviews', ['book_uid']),
+    ('ix_reviews_user_uid', 'reviews', ['user_uid']),
+    ('ix_reviews_created_at', 'reviews', ['created_at']),
+    ('ix_tag_name', 'tag', ['name']),
+    ('ix_booktag_tag_uid', 'booktag', ['tag_uid']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction, and keeps the tables
+    # writable while each index builds
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
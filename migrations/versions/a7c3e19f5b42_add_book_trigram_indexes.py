@@ -0,0 +1,54 @@
+"""Add book title and author trigram indexes
+
+Revision ID: a7c3e19f5b42
+Revises: f4c1e83a6d92
+Create Date: 2026-10-18 18:31:04.118257
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e19f5b42'
+down_revision: Union[str, None] = 'f4c1e83a6d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, column)
+INDEXES = [
+    ('ix_books_title_trgm', 'Title'),
+    ('ix_books_author_trgm', 'Author'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.create_index(
+                name,
+                'books',
+                [column],
+                # GiST rather than GIN, as only GiST can return rows nearest first
+                postgresql_using='gist',
+                postgresql_ops={column: 'gist_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    # pg_trgm is left installed; dropping it would take any other objects
+    # using it along
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name='books',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,78 @@
+"""Add keyset pagination indexes
+
+Revision ID: b7e41c2d9a50
+Revises: 9633816f1cdc
+Create Date: 2026-10-18 15:05:41.207519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41c2d9a50'
+down_revision: Union[str, None] = '9633816f1cdc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) matching the (created_at, uid) list ordering
+INDEXES = [
+    ('ix_books_created_at_uid', 'books', ['created_at', 'uid']),
+    ('ix_books_user_uid_created_at_uid', 'books', ['user_uid', 'created_at', 'uid']),
+    ('ix_reviews_created_at_uid', 'reviews', ['created_at', 'uid']),
+    ('ix_tag_created_at_uid', 'tag', ['created_at', 'uid']),
+]
+
+# Superseded by the indexes above
+REPLACED = [
+    ('ix_books_created_at', 'books', ['created_at']),
+    ('ix_books_user_uid_created_at', 'books', ['user_uid', 'created_at']),
+    ('ix_reviews_created_at', 'reviews', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    # A NULL created_at would fall out of every keyset page
+    op.execute("UPDATE tag SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('tag', 'created_at', existing_type=sa.TIMESTAMP(), nullable=False)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, columns in REPLACED:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.alter_column('tag', 'created_at', existing_type=sa.TIMESTAMP(), nullable=True)
@@ -0,0 +1,41 @@
+"""Add book genre index
+
+Revision ID: c2f81d6a9e37
+Revises: a7c3e19f5b42
+Create Date: 2026-10-18 19:12:47.503981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f81d6a9e37'
+down_revision: Union[str, None] = 'a7c3e19f5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_genre',
+            'books',
+            ['Genre'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_books_genre',
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,61 @@
+"""Unique case-insensitive tag names
+
+Revision ID: d3f8a61b7c24
+Revises: b7e41c2d9a50
+Create Date: 2026-10-18 16:20:13.584102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8a61b7c24'
+down_revision: Union[str, None] = 'b7e41c2d9a50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Merge tags whose names differ only in case into the oldest one, moving their
+# book links across, before the unique index can be built
+MERGE_DUPLICATES = [
+    """
+    CREATE TEMPORARY TABLE tag_merge ON COMMIT DROP AS
+    SELECT uid, keep_uid FROM (
+        SELECT uid,
+               first_value(uid) OVER (
+                   PARTITION BY lower(name) ORDER BY created_at, uid
+               ) AS keep_uid
+        FROM tag
+    ) ranked
+    WHERE uid <> keep_uid
+    """,
+    """
+    INSERT INTO booktag (book_uid, tag_uid)
+    SELECT booktag.book_uid, tag_merge.keep_uid
+    FROM booktag JOIN tag_merge ON booktag.tag_uid = tag_merge.uid
+    ON CONFLICT DO NOTHING
+    """,
+    "DELETE FROM booktag USING tag_merge WHERE booktag.tag_uid = tag_merge.uid",
+    "DELETE FROM tag USING tag_merge WHERE tag.uid = tag_merge.uid",
+]
+
+
+def upgrade() -> None:
+    # Blocks tag writes until commit, so no new duplicate can land between the
+    # merge and the index build. The tag table is small enough for that.
+    op.execute("LOCK TABLE tag IN SHARE ROW EXCLUSIVE MODE")
+    for statement in MERGE_DUPLICATES:
+        op.execute(statement)
+    op.create_index(
+        'ix_tag_lower_name', 'tag', [sa.text('lower(name)')], unique=True
+    )
+    op.drop_index('ix_tag_name', table_name='tag')
+
+
+def downgrade() -> None:
+    # Merged duplicates are not restored
+    op.create_index('ix_tag_name', 'tag', ['name'])
+    op.drop_index('ix_tag_lower_name', table_name='tag')
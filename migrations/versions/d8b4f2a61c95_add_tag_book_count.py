@@ -0,0 +1,61 @@
+"""Add tag book counts and prefix matching on tag names
+
+Revision ID: d8b4f2a61c95
+Revises: c2f81d6a9e37
+Create Date: 2026-10-18 19:58:21.640317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4f2a61c95'
+down_revision: Union[str, None] = 'c2f81d6a9e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = """
+    UPDATE tag SET book_count = counts.book_count
+    FROM (
+        SELECT tag_uid, count(*) AS book_count FROM booktag GROUP BY tag_uid
+    ) counts
+    WHERE tag.uid = counts.tag_uid
+"""
+
+
+def upgrade() -> None:
+    # Blocks book tagging until commit, so no link is missed by the backfill
+    op.execute("LOCK TABLE booktag IN SHARE MODE")
+    op.add_column(
+        'tag',
+        sa.Column('book_count', sa.INTEGER(), server_default='0', nullable=False),
+    )
+    op.execute(BACKFILL)
+
+    # Same uniqueness, rebuilt with an operator class that also serves
+    # LIKE 'prefix%'. The tag table is small enough to rebuild in place.
+    op.drop_index('ix_tag_lower_name', table_name='tag')
+    op.create_index(
+        'ix_tag_lower_name',
+        'tag',
+        [sa.text('lower(name) text_pattern_ops')],
+        unique=True,
+    )
+    op.create_index(
+        'ix_tag_book_count',
+        'tag',
+        [sa.text('book_count DESC'), sa.text('lower(name)')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tag_book_count', table_name='tag')
+    op.drop_index('ix_tag_lower_name', table_name='tag')
+    op.create_index(
+        'ix_tag_lower_name', 'tag', [sa.text('lower(name)')], unique=True
+    )
+    op.drop_column('tag', 'book_count')
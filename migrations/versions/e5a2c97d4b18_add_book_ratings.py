@@ -0,0 +1,89 @@
+"""Add book rating aggregates
+
+Revision ID: e5a2c97d4b18
+Revises: d3f8a61b7c24
+Create Date: 2026-10-18 17:02:37.915240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c97d4b18'
+down_revision: Union[str, None] = 'd3f8a61b7c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = """
+    INSERT INTO book_ratings (
+        book_uid, review_count, rating_sum,
+        rating_1, rating_2, rating_3, rating_4, rating_5, last_reviewed_at
+    )
+    SELECT book_uid, count(*), sum(rating),
+           count(*) FILTER (WHERE rating = 1),
+           count(*) FILTER (WHERE rating = 2),
+           count(*) FILTER (WHERE rating = 3),
+           count(*) FILTER (WHERE rating = 4),
+           count(*) FILTER (WHERE rating = 5),
+           max(created_at)
+    FROM reviews
+    GROUP BY book_uid
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'book_ratings',
+        sa.Column('book_uid', postgresql.UUID(), nullable=False),
+        sa.Column('review_count', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('rating_sum', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('rating_1', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('rating_2', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('rating_3', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('rating_4', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('rating_5', sa.INTEGER(), server_default='0', nullable=False),
+        sa.Column('last_reviewed_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['book_uid'], ['books.uid'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('book_uid'),
+    )
+    # Reviews written between this backfill and the new code rolling out are
+    # picked up by rebuild_book_ratings
+    op.execute(BACKFILL)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_book_uid_created_at',
+            'reviews',
+            ['book_uid', 'created_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_reviews_book_uid',
+            table_name='reviews',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_book_uid',
+            'reviews',
+            ['book_uid'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_reviews_book_uid_created_at',
+            table_name='reviews',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table('book_ratings')
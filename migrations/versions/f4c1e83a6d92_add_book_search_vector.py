@@ -0,0 +1,59 @@
+"""Add book full-text search vector
+
+Revision ID: f4c1e83a6d92
+Revises: e5a2c97d4b18
+Create Date: 2026-10-18 17:48:26.730418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1e83a6d92'
+down_revision: Union[str, None] = 'e5a2c97d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match BOOK_SEARCH_VECTOR in src/db/models.py
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(\"Title\", '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(\"Author\", '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites books under an exclusive lock,
+    # so run this in a maintenance window on large catalogs
+    op.add_column(
+        'books',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_search_vector',
+            'books',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_books_search_vector',
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('books', 'search_vector')
@@ -1,12 +1,14 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI
 from src.books.routes import book_router
 from src.auth.routes import user_router
 from src.tags.routes import tag_router
 from src.reviews.routes import reviews_router
 from .config import settings
 from contextlib import asynccontextmanager
-from src.db.main import init_db
+from src.db.redis import sync_channels
+import asyncio
 from .middleware import register_middleware
+from .metrics import register_metrics
 
 # from dotenv import load_dotenv
 
@@ -20,25 +22,24 @@ ROOT_ROUTE = settings.ROOT_ROUTE
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print("Server has Started Running...")
-    try:
-        await init_db()
-    except:
-        print("Database Connection Failed")
-        raise HTTPException(
-            status_code=status.HTTP_424_FAILED_DEPENDENCY,
-            detail="Database Connection Failed",
-        )
+    # The schema is managed by the Alembic migrations, not created here
+    channel_sync = asyncio.create_task(sync_channels())
     yield
+    channel_sync.cancel()
     print("Server Stopped Running!")
 
 
 app = FastAPI(
-    title="Bookly", description="A REST app of Books Library", version=version
+    title="Bookly",
+    description="A REST app of Books Library",
+    version=version,
+    lifespan=life_span,
 )
 
 # Register Middleware
 
 register_middleware(app)
+register_metrics(app)
 
 
 # Add Routers
@@ -0,0 +1,36 @@
+from src.cache import TieredCache
+from src.config import settings
+from src.db.redis import follow_channel
+from .schema import UserAuthModal
+
+USER_CACHE_PREFIX = "user_cache:"
+USER_CACHE_CHANNEL = "user_cache_invalidate"
+
+
+def email_key(email: str) -> str:
+    return f"email:{email}"
+
+
+def uid_key(uid) -> str:
+    return f"uid:{uid}"
+
+
+class UserCache(TieredCache):
+    """Read-through cache of user projections, keyed by email and by uid."""
+
+    def encode(self, user: UserAuthModal) -> str:
+        return user.model_dump_json()
+
+    def decode(self, payload: str) -> UserAuthModal:
+        return UserAuthModal.model_validate_json(payload)
+
+
+user_cache = UserCache(
+    prefix=USER_CACHE_PREFIX,
+    channel=USER_CACHE_CHANNEL,
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+    use_redis=settings.USER_CACHE_REDIS,
+)
+
+follow_channel(USER_CACHE_CHANNEL, user_cache.drop, resync=user_cache.resync)
@@ -1,12 +1,18 @@
 from typing import Optional, Dict, List
+from dataclasses import dataclass
 from fastapi import Request, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
-from .utils import decode_token
-from src.db.redis import token_in_blacklist
+from .utils import verify_token
+from src.db.redis import (
+    token_in_blacklist,
+    token_generation_revoked,
+    get_user_version,
+)
 from src.db.main import get_session
 from src.auth.service import UserService
-from src.db.models import User
+from src.config import settings
+from .schema import UserAuthModal
 
 
 user_service = UserService()
@@ -17,11 +23,22 @@ class TokenBearer(HTTPBearer):
         super().__init__(auto_error=auto_error)
 
     async def __call__(self, request: Request) -> Optional[Dict]:
+        # Decoding and the blacklist lookup run once per request, however many
+        # bearer instances the route's dependency tree pulls in
+        token_data = getattr(request.state, "token_data", None)
+        if token_data is None:
+            token_data = await self.resolve_token(request)
+            request.state.token_data = token_data
+
+        self.verify_token_data(token_data)
+        return token_data
+
+    async def resolve_token(self, request: Request) -> Dict:
         credentials: HTTPAuthorizationCredentials = await super().__call__(request)
 
-        token_data = decode_token(credentials.credentials)
+        token_data = verify_token(credentials.credentials)
 
-        if not self.token_valid(credentials.credentials):
+        if token_data is None:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail={
@@ -29,7 +46,8 @@ class TokenBearer(HTTPBearer):
                     "resolution": "Please get a new token",
                 },
             )
-        if await token_in_blacklist(token_data["jti"]):
+        revoked = await token_in_blacklist(token_data["jti"])
+        if revoked or await token_generation_revoked(token_data["user"]):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -37,12 +55,8 @@ class TokenBearer(HTTPBearer):
                     "resolution": "Please get a new token",
                 },
             )
-        self.verify_token_data(token_data)
         return token_data
 
-    def token_valid(self, token: str) -> bool:
-        return decode_token(token) is not None
-
     def verify_token_data(self, token_data: dict):
         """This should be overridden in subclasses for custom validation."""
         raise NotImplementedError(
@@ -70,8 +84,39 @@ class RefreshTokenBearer(TokenBearer):
         )
 
 
+access_token_bearer = AccessTokenBearer()
+
+
+@dataclass
+class Principal:
+    """The authenticated caller, resolved once per request."""
+
+    token_data: dict
+    user: UserAuthModal
+
+    @property
+    def jti(self) -> str:
+        return self.token_data["jti"]
+
+    @property
+    def user_uid(self):
+        return self.user.uid
+
+    @property
+    def email(self) -> str:
+        return self.user.email
+
+    @property
+    def role(self) -> str:
+        return self.user.role
+
+    @property
+    def is_verified(self) -> bool:
+        return self.user.is_verified
+
+
 async def get_current_user(
-    token_details: dict = Depends(AccessTokenBearer()),
+    token_details: dict = Depends(access_token_bearer),
     session: AsyncSession = Depends(get_session),
 ):
     user_email = token_details["user"]["email"]
@@ -85,17 +130,47 @@ async def get_current_user(
     return user_detail
 
 
+async def claims_are_current(user_claims: dict) -> bool:
+    """Token claims can stand in for the user row until the user's version moves on."""
+    if "version" not in user_claims or "is_verified" not in user_claims:
+        return False
+    return await get_user_version(user_claims["user_uid"]) == user_claims["version"]
+
+
+async def get_principal(
+    token_details: dict = Depends(access_token_bearer),
+    session: AsyncSession = Depends(get_session),
+) -> Principal:
+    user_claims = token_details["user"]
+    if settings.STATELESS_AUTH and await claims_are_current(user_claims):
+        auth_user = UserAuthModal(
+            uid=user_claims["user_uid"],
+            email=user_claims["email"],
+            role=user_claims["role"],
+            is_verified=user_claims["is_verified"],
+        )
+        return Principal(token_data=token_details, user=auth_user)
+
+    auth_user = await user_service.get_auth_user(user_claims["email"], session)
+    if not auth_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User Detail not found"
+        )
+
+    return Principal(token_data=token_details, user=auth_user)
+
+
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_user)):
-        if not current_user.is_verified:
+    def __call__(self, principal: Principal = Depends(get_principal)):
+        if not principal.is_verified:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User Not Verified. Please Verify your Account to access the route",
             )
-        if current_user.role in self.allowed_roles:
+        if principal.role in self.allowed_roles:
             return True
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
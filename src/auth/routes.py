@@ -14,15 +14,22 @@ from .schema import (
     NewPasswordModal,
 )
 from .service import UserService
-from .utils import verify_pass, create_access_token
+from .utils import check_and_update_password, create_access_token
 from datetime import timedelta, datetime
 from .dependencies import (
     RefreshTokenBearer,
-    AccessTokenBearer,
+    access_token_bearer,
     get_current_user,
+    get_principal,
+    Principal,
     RoleChecker,
 )
-from src.db.redis import add_jti_to_blacklist
+from src.db.redis import (
+    add_jti_to_blacklist,
+    ensure_user_version,
+    load_token_generation,
+    revoke_user_tokens,
+)
 from src.mail import create_message, mail
 from src.config import settings
 from .utils import create_safe_token, decode_safe_token
@@ -142,22 +149,24 @@ async def log_User(
     user_Info = await user_service.get_user(email, session)
 
     if user_Info is not None:
-        password_valid = verify_pass(password, user_Info.password_hash)
+        password_valid, new_hash = await check_and_update_password(
+            password, user_Info.password_hash
+        )
 
         if password_valid:
-            access_token = create_access_token(
-                user_data={
-                    "email": user_Info.email,
-                    "user_uid": str(user_Info.uid),
-                    "role": user_Info.role,
-                }
-            )
+            if new_hash:
+                await user_service.rehash_password(user_Info, new_hash, session)
+            user_claims = {
+                "email": user_Info.email,
+                "user_uid": str(user_Info.uid),
+                "role": user_Info.role,
+                "is_verified": user_Info.is_verified,
+                "version": await ensure_user_version(str(user_Info.uid)),
+                "generation": await load_token_generation(str(user_Info.uid)),
+            }
+            access_token = create_access_token(user_data=user_claims)
             refresh_token = create_access_token(
-                user_data={
-                    "email": user_Info.email,
-                    "user_uid": str(user_Info.uid),
-                    "role": user_Info.role,
-                },
+                user_data=user_claims,
                 expiry=timedelta(days=7),
                 refresh=True,
             )
@@ -203,7 +212,11 @@ async def verify_account(token: str, session: AsyncSession = Depends(get_session
 @user_router.get(
     "/me", response_model=UserBookModal, response_model_exclude={"password_hash"}
 )
-async def current_user(user=Depends(get_current_user)):
+async def current_user(
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+):
+    user = await user_service.get_user(principal.email, session, load_library=True)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -230,7 +243,7 @@ async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer(
 
 
 @user_router.get("/logout")
-async def revoke_token(token_data: dict = Depends(AccessTokenBearer())):
+async def revoke_token(token_data: dict = Depends(access_token_bearer)):
     jti = token_data["jti"]
 
     await add_jti_to_blacklist(jti)
@@ -240,6 +253,16 @@ async def revoke_token(token_data: dict = Depends(AccessTokenBearer())):
     )
 
 
+@user_router.get("/logout_all")
+async def revoke_all_tokens(token_data: dict = Depends(access_token_bearer)):
+    await revoke_user_tokens(token_data["user"]["user_uid"])
+
+    return JSONResponse(
+        content={"message": "Logged Out of all Sessions Successfully"},
+        status_code=status.HTTP_200_OK,
+    )
+
+
 # Create a Password Reset Link Email Route
 @user_router.post("/password_reset_request")
 async def password_reset_request(
@@ -35,6 +35,13 @@ class UserResponseModal(BaseModel):
     updated_at: datetime
 
 
+class UserAuthModal(BaseModel):
+    uid: uuid.UUID
+    email: str
+    role: str
+    is_verified: bool
+
+
 class UserBookModal(UserResponseModal):
     books: List[Book]
     reviews: List[ReviewModal]
@@ -1,14 +1,21 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
+import logging
 from src.db.models import User
 from sqlmodel import select, update, delete
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
-from .schema import UserCreateModal
-from .utils import generate_pass_hash
+from .schema import UserCreateModal, UserAuthModal
+from .utils import hash_password
+from src.db.redis import bump_user_version, revoke_user_tokens
+from .cache import user_cache, email_key, uid_key
 from fastapi.responses import JSONResponse
+import time
 
 
 class UserService:
-    async def get_user(self, email: str, session: AsyncSession):
+    async def get_user(
+        self, email: str, session: AsyncSession, load_library: bool = False
+    ):
         try:
             if email is None:
                 raise HTTPException(
@@ -17,6 +24,10 @@ class UserService:
                 )
 
             statement = select(User).where(User.email == email)
+            if load_library:
+                statement = statement.options(
+                    selectinload(User.books), selectinload(User.reviews)
+                )
             result = await session.exec(statement)
 
             user = result.first()
@@ -29,6 +40,43 @@ class UserService:
                 detail=f"Error getting User : {str(e)}",
             )
 
+    async def get_auth_user(self, email: str, session: AsyncSession):
+        """Load only the columns authorization needs, never the user's library."""
+        return await self.load_auth_user(email_key(email), User.email == email, session)
+
+    async def get_auth_user_by_uid(self, uid: str, session: AsyncSession):
+        return await self.load_auth_user(uid_key(uid), User.uid == uid, session)
+
+    async def load_auth_user(self, cache_key: str, condition, session: AsyncSession):
+        try:
+            auth_user = await user_cache.get(cache_key)
+            if auth_user is not None:
+                return auth_user
+
+            read_at = time.monotonic()
+            statement = select(User.uid, User.email, User.role, User.is_verified).where(
+                condition
+            )
+            result = await session.exec(statement)
+
+            row = result.first()
+            if row is None:
+                return None
+
+            auth_user = UserAuthModal(**row._asdict())
+            await user_cache.set(
+                [email_key(auth_user.email), uid_key(auth_user.uid)],
+                auth_user,
+                read_at,
+            )
+            return auth_user
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error getting User : {str(e)}",
+            )
+
     async def get_user_by_uid(self, uid: str, session: AsyncSession):
         try:
             if uid is None:
@@ -73,14 +121,12 @@ class UserService:
             new_user = User(**user_data_dict)
 
             new_user.role = "user"
-            new_user.password_hash = generate_pass_hash(user_data_dict["password"])
+            new_user.password_hash = await hash_password(user_data_dict["password"])
 
             session.add(new_user)  # No need to await session.add()
             await session.commit()
             await session.refresh(new_user)
 
-            return new_user
-
         except Exception as e:
             await session.rollback()
             raise HTTPException(
@@ -88,8 +134,12 @@ class UserService:
                 detail=f"Error creating User : {str(e)}",
             )
 
+        await user_cache.invalidate(email_key(new_user.email), uid_key(new_user.uid))
+        return new_user
+
     async def update_user(self, user: User, update_data: dict, session: AsyncSession):
         try:
+            cache_keys = [email_key(user.email), uid_key(user.uid)]
             for key, value in update_data.items():
                 if hasattr(user, key):
                     setattr(user, key, value)
@@ -97,9 +147,6 @@ class UserService:
                     raise ValueError(f"Invalid attribute: {key}")
             await session.commit()
             await session.refresh(user)
-            return {
-                "message": f"Account with username {user.username} updated successfully"
-            }
         except Exception as e:
             await session.rollback()
             raise HTTPException(
@@ -107,23 +154,59 @@ class UserService:
                 detail=f"Error Updating User : {str(e)}",
             )
 
+        await self.after_user_write([*cache_keys, email_key(user.email)], str(user.uid))
+        return {
+            "message": f"Account with username {user.username} updated successfully"
+        }
+
+    async def after_user_write(
+        self, cache_keys: list, user_uid: str, revoke_tokens: bool = False
+    ):
+        """Drop the user's cached projection and move their version on, once a
+        write has committed. That write stands either way, so Redis errors are
+        logged rather than raised."""
+        await user_cache.invalidate(*cache_keys)
+        try:
+            await bump_user_version(user_uid)
+            if revoke_tokens:
+                await revoke_user_tokens(user_uid)
+        except Exception as e:
+            logging.error(f"Error revoking tokens of user {user_uid} : {e!r}")
+
+    async def rehash_password(
+        self, user: User, password_hash: str, session: AsyncSession
+    ):
+        # Same password under a new cost, so existing sessions stay valid
+        try:
+            user.password_hash = password_hash
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logging.warning(f"Error rehashing password for {user.username} : {str(e)}")
+
     async def update_password(
         self, user: User, new_password: str, session: AsyncSession
     ):
         try:
-            password_hash = generate_pass_hash(new_password)
+            password_hash = await hash_password(new_password)
             user.password_hash = password_hash
             await session.commit()
             await session.refresh(user)
-            return JSONResponse(
-                content={
-                    "message": f"User with username {user.username}'s password has been updated successfully. Please Login to your account with the new password"
-                },
-                status_code=status.HTTP_200_OK,
-            )
         except Exception as e:
             await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Something went wrong when updating password: {str(e)}",
             )
+
+        await self.after_user_write(
+            [email_key(user.email), uid_key(user.uid)],
+            str(user.uid),
+            revoke_tokens=True,
+        )
+        return JSONResponse(
+            content={
+                "message": f"User with username {user.username}'s password has been updated successfully. Please Login to your account with the new password"
+            },
+            status_code=status.HTTP_200_OK,
+        )
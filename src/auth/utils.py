@@ -1,13 +1,27 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from prometheus_client import Gauge, Histogram
+import asyncio
+import os
+import time
 import uuid
 from src.config import settings
 import jwt
+import hashlib
 import logging
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired
 from src.config import settings
+from src.cache import TTLCache
 
-password_context = CryptContext(schemes=["bcrypt"])
+# Hashes made with any other cost are rehashed on the next successful login
+password_context = CryptContext(
+    schemes=["bcrypt"], bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
+
+# Verified JWT claims keyed by a digest of the raw token
+token_claims_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
 
 
 def generate_pass_hash(password: str) -> str:
@@ -19,6 +33,80 @@ def verify_pass(password: str, hash: str) -> bool:
     return password_context.verify(password, hash)
 
 
+def verify_and_update_pass(password: str, hash: str):
+    """Return whether the password matches, plus a fresh hash if the stored one
+    uses an outdated cost."""
+    return password_context.verify_and_update(password, hash)
+
+
+hash_queue_depth = Gauge(
+    "password_hash_queue_depth", "Password hash jobs waiting for a worker"
+)
+hash_in_flight = Gauge("password_hash_in_flight", "Password hash jobs running")
+hash_seconds = Histogram(
+    "password_hash_seconds", "Time spent hashing or verifying passwords", ["operation"]
+)
+
+
+class HashPool:
+    """Runs bcrypt off the event loop with at most ``workers`` jobs at a time,
+    so a login burst cannot stall unrelated requests on the same worker."""
+
+    def __init__(self, workers: int, use_processes: bool = False, max_queue: int = 0):
+        self.executor = (
+            ProcessPoolExecutor(max_workers=workers)
+            if use_processes
+            else ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pass_hash")
+        )
+        self.slots = asyncio.Semaphore(workers)
+        self.max_queue = max_queue
+        self.waiting = 0
+
+    async def run(self, operation: str, func, *args):
+        if self.max_queue and self.waiting >= self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress. Please try again",
+            )
+
+        self.waiting += 1
+        hash_queue_depth.inc()
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+            hash_queue_depth.dec()
+
+        hash_in_flight.inc()
+        start_time = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            hash_seconds.labels(operation).observe(time.perf_counter() - start_time)
+            hash_in_flight.dec()
+            self.slots.release()
+
+
+hash_pool = HashPool(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    use_processes=settings.PASSWORD_HASH_EXECUTOR == "process",
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await hash_pool.run("hash", generate_pass_hash, password)
+
+
+async def check_password(password: str, hash: str) -> bool:
+    return await hash_pool.run("verify", verify_pass, password, hash)
+
+
+async def check_and_update_password(password: str, hash: str):
+    return await hash_pool.run("verify", verify_and_update_pass, password, hash)
+
+
 def create_access_token(
     user_data: dict, expiry: timedelta = None, refresh: bool = False
 ):
@@ -51,6 +139,35 @@ def decode_token(token: str):
         return None
 
 
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def token_seconds_left(token_data: dict) -> float:
+    try:
+        expiry_datetime = datetime.fromisoformat(token_data["expiry"])
+    except (KeyError, TypeError, ValueError):
+        return 0
+    return (expiry_datetime - datetime.now()).total_seconds()
+
+
+def verify_token(token: str):
+    """Decode a JWT at most once and reuse its claims until the token expires."""
+    digest = token_digest(token)
+    token_data = token_claims_cache.get(digest)
+    if token_data is not None:
+        return token_data
+
+    token_data = decode_token(token)
+    if token_data is None:
+        return None
+
+    seconds_left = token_seconds_left(token_data)
+    if seconds_left > 0:
+        token_claims_cache.set(digest, token_data, ttl=seconds_left)
+    return token_data
+
+
 def create_safe_token(data: dict):
     try:
         serializer = URLSafeTimedSerializer(secret_key=settings.DANGEROUS_TOKEN)
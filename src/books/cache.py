@@ -0,0 +1,78 @@
+from typing import Optional
+from src.cache import TTLCache, TieredCache
+from src.config import settings
+from src.db import redis
+from src.db.redis import follow_channel
+import json
+import logging
+import time
+
+GENRE_FACETS_PREFIX = "genre_facets:"
+GENRE_FACETS_GENERATION = "genre_facets_generation"
+BOOK_DETAIL_PREFIX = "book_detail:"
+BOOK_DETAIL_CHANNEL = "book_detail_invalidate"
+
+
+class GenreFacetCache:
+    """Per-genre book counts, shared through Redis and kept per worker.
+
+    Entries are keyed by a generation that every book write bumps, so counts
+    computed from a snapshot older than the write are never served again,
+    even when they are stored after it.
+    """
+
+    def __init__(self, ttl: int):
+        self.local = TTLCache(maxsize=2, ttl=ttl)
+        self.ttl = ttl
+
+    # Seeded from the clock so a flushed key never repeats an old generation
+    async def generation(self) -> int:
+        generation = await redis.client.get(GENRE_FACETS_GENERATION)
+        if generation is None:
+            await redis.client.set(GENRE_FACETS_GENERATION, time.time_ns(), nx=True)
+            generation = await redis.client.get(GENRE_FACETS_GENERATION)
+        return int(generation)
+
+    async def get(self, generation: int) -> Optional[list]:
+        facets = self.local.get(generation)
+        if facets is not None:
+            return facets
+
+        payload = await redis.client.get(f"{GENRE_FACETS_PREFIX}{generation}")
+        if payload is None:
+            return None
+        facets = json.loads(payload)
+        self.local.set(generation, facets)
+        return facets
+
+    async def set(self, generation: int, facets: list):
+        self.local.set(generation, facets)
+        await redis.client.set(
+            f"{GENRE_FACETS_PREFIX}{generation}", json.dumps(facets), ex=self.ttl
+        )
+
+    async def invalidate(self):
+        # Called once a write has committed, so a Redis failure is logged
+        # rather than raised; the cached counts then expire after the TTL
+        try:
+            await redis.client.set(GENRE_FACETS_GENERATION, time.time_ns(), nx=True)
+            await redis.client.incr(GENRE_FACETS_GENERATION)
+        except Exception as e:
+            logging.warning(f"Error invalidating cached genre counts : {e!r}")
+
+
+genre_facet_cache = GenreFacetCache(ttl=settings.GENRE_FACETS_TTL)
+
+
+# Serialized BookDetailModal payloads, keyed by uid
+book_detail_cache = TieredCache(
+    prefix=BOOK_DETAIL_PREFIX,
+    channel=BOOK_DETAIL_CHANNEL,
+    maxsize=settings.BOOK_CACHE_SIZE,
+    ttl=settings.BOOK_CACHE_TTL,
+    use_redis=settings.BOOK_CACHE_REDIS,
+)
+
+follow_channel(
+    BOOK_DETAIL_CHANNEL, book_detail_cache.drop, resync=book_detail_cache.resync
+)
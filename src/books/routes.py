@@ -1,53 +1,134 @@
-from fastapi import APIRouter, status, HTTPException, Depends, dependencies
-from src.books.schemas import Book, BookUpdate, BookCreate, BookDetailModal
-from typing import List
+from fastapi import (
+    APIRouter,
+    status,
+    HTTPException,
+    Depends,
+    dependencies,
+    Request,
+    Response,
+    Query,
+)
+from src.books.schemas import (
+    Book,
+    BookUpdate,
+    BookCreate,
+    BookDetailModal,
+    BookImportResult,
+    GenreFacet,
+)
+from typing import List, Literal
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
-from src.books.service import BooksService
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.db.main import get_session, get_read_session, read_session_factory
+from src.books.service import (
+    BooksService,
+    GenreFilter,
+    genre_filter,
+    parse_book_records,
+)
+from src.auth.dependencies import access_token_bearer, RoleChecker
+from src.pagination import Page, PageParams, page_params, rank_page_params
+from src.export import ndjson_response
+from src.config import settings
 
 admin_checker = Depends(RoleChecker(["admin"]))
 user_checker = Depends(RoleChecker(["user", "admin"]))
 
 book_router = APIRouter()
 book_service = BooksService()
-access_token_bearer = AccessTokenBearer()
 
 
 # Get All Books
-@book_router.get("/books", dependencies=[admin_checker])
+@book_router.get("/books", response_model=Page[Book], dependencies=[admin_checker])
 async def get_all_books(
-    session: AsyncSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+    genres: GenreFilter = Depends(genre_filter),
+    session: AsyncSession = Depends(get_read_session),
     token_data: dict = Depends(access_token_bearer),
 ):
-    all_books = await book_service.get_all_books(session)
+    all_books = await book_service.get_all_books(session, page, genres)
     return all_books
 
 
+# Search Books by Title and Author
+@book_router.get(
+    "/books/search", response_model=Page[Book], dependencies=[user_checker]
+)
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: PageParams = Depends(rank_page_params),
+    genres: GenreFilter = Depends(genre_filter),
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(access_token_bearer),
+):
+    """Books matching q, best first.
+
+    When SEARCH_MAX_MATCHES is set, a query matching more books than that
+    ranks only the newest of them.
+    """
+    return await book_service.search_books(q, session, page, genres)
+
+
+# Typo-tolerant Lookup by Title and Author
+@book_router.get("/books/fuzzy", response_model=List[Book], dependencies=[user_checker])
+async def fuzzy_books(
+    q: str = Query(..., min_length=3, max_length=200),
+    threshold: float = Query(settings.FUZZY_THRESHOLD_DEFAULT, ge=0.1, le=1),
+    limit: int = Query(settings.FUZZY_LIMIT_DEFAULT, ge=1, le=settings.FUZZY_LIMIT_MAX),
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(access_token_bearer),
+):
+    return await book_service.fuzzy_books(q, session, threshold, limit)
+
+
+# Count Books per Genre
+@book_router.get(
+    "/books/genres", response_model=List[GenreFacet], dependencies=[user_checker]
+)
+async def get_genre_facets(
+    # The counts are cached until the next book write, so they are taken on
+    # the primary: a lagging replica would cache counts from before that write
+    session: AsyncSession = Depends(get_session),
+    token_data: dict = Depends(access_token_bearer),
+):
+    return await book_service.get_genre_facets(session)
+
+
+# Export All Books as NDJSON
+@book_router.get("/books/export", dependencies=[admin_checker])
+async def export_books(token_data: dict = Depends(access_token_bearer)):
+    session_factory = await read_session_factory()
+    return ndjson_response(book_service.export_books(session_factory), "books")
+
+
 # Get a Book
 @book_router.get(
     "/book/{book_uid}", response_model=BookDetailModal, dependencies=[user_checker]
 )
 async def get_single_book(
     book_uid: str,
+    # Misses fill the cache, so they read the primary: a lagging replica could
+    # hand back a book as it was before a write that just invalidated it
     session: AsyncSession = Depends(get_session),
     token_data: dict = Depends(access_token_bearer),
 ):
-    # CHECK the Response
-    book_detail = await book_service.get_single_book(book_uid, session)
-
-    return book_detail
+    # Already serialized, so it goes out as is rather than through the model
+    payload = await book_service.get_book_detail(book_uid, session)
+    return Response(content=payload, media_type="application/json")
 
 
 # Get User's All Books
-@book_router.get("/user/all_books", dependencies=[user_checker])
+@book_router.get(
+    "/user/all_books", response_model=Page[Book], dependencies=[user_checker]
+)
 async def get_user_books(
-    session: AsyncSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+    genres: GenreFilter = Depends(genre_filter),
+    session: AsyncSession = Depends(get_read_session),
     token_data: dict = Depends(access_token_bearer),
 ):
     user_uid = token_data.get("user")["user_uid"]
 
-    user_books = await book_service.get_user_books(user_uid, session)
+    user_books = await book_service.get_user_books(user_uid, session, page, genres)
     return user_books
 
 
@@ -62,6 +143,25 @@ async def add_book(
     return await book_service.create_book(book_data, user_uuid, session)
 
 
+# Bulk Import Books from a JSON array, NDJSON or CSV body
+@book_router.post(
+    "/book/import_books",
+    response_model=BookImportResult,
+    dependencies=[user_checker],
+)
+async def import_books(
+    request: Request,
+    on_conflict: Literal["skip", "upsert"] = "skip",
+    session: AsyncSession = Depends(get_session),
+    token_data: dict = Depends(access_token_bearer),
+):
+    user_uuid = token_data.get("user")["user_uid"]
+    records = parse_book_records(
+        await request.body(), request.headers.get("content-type", "")
+    )
+    return await book_service.import_books(records, user_uuid, on_conflict, session)
+
+
 # Update Book
 @book_router.patch("/book/update_book/{book_uid}", dependencies=[user_checker])
 async def update_book(
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import List, Optional
 from datetime import datetime, date
 import uuid
@@ -6,6 +6,27 @@ from src.reviews.schema import ReviewModal
 from src.tags.schemas import TagCreateModal
 
 
+class BookRatingModal(BaseModel):
+    review_count: int = 0
+    rating_sum: int = 0
+    rating_1: int = 0
+    rating_2: int = 0
+    rating_3: int = 0
+    rating_4: int = 0
+    rating_5: int = 0
+    last_reviewed_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def average_rating(self) -> Optional[float]:
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    class Config:
+        from_attributes = True
+
+
 class Book(BaseModel):
     uid: uuid.UUID
     Title: str
@@ -14,6 +35,8 @@ class Book(BaseModel):
     Genre: List[str]
     created_at: datetime
     updated_at: datetime
+    # None until the book gets its first review
+    rating: Optional[BookRatingModal] = None
 
     class Config:
         from_attributes = True
@@ -27,6 +50,11 @@ class BookDetailModal(Book):
         from_attributes = True
 
 
+class GenreFacet(BaseModel):
+    genre: str
+    count: int
+
+
 class BookUpdate(BaseModel):
     Title: Optional[str] = None
     Author: Optional[str] = None
@@ -43,3 +71,18 @@ class BookCreate(BaseModel):
 
 class BookTags(Book):
     tags: List[TagCreateModal]
+
+
+class BookImportRow(BaseModel):
+    row: int
+    status: str  # "inserted", "updated", "skipped" or "error"
+    uid: Optional[uuid.UUID] = None
+    detail: Optional[str] = None
+
+
+class BookImportResult(BaseModel):
+    inserted: int
+    updated: int
+    skipped: int
+    failed: int
+    rows: List[BookImportRow]
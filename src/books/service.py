@@ -1,33 +1,316 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi import HTTPException, status, Depends
-from sqlmodel import select, desc, delete
-from sqlalchemy.orm import selectinload
-from src.db.models import Book
+from fastapi import HTTPException, status, Depends, Query
+from sqlmodel import select, desc, delete, update, func
+from sqlalchemy.orm import selectinload, joinedload, aliased
+from src.db.models import Book, BookTag, Tag, BOOK_SEARCH_VECTOR
 from src.reviews.schema import ReviewModal
-from .schemas import BookCreate, BookUpdate
+from .schemas import (
+    Book as BookSchema,
+    BookDetailModal,
+    BookCreate,
+    BookUpdate,
+    BookImportRow,
+    BookImportResult,
+)
 from datetime import datetime
+from dataclasses import dataclass, field
+from typing import List, Optional
+from pydantic import ValidationError
+from sqlalchemy import Float, String, literal, literal_column, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.config import settings
 from src.auth.dependencies import AccessTokenBearer
+from src.pagination import PageParams, paginate, build_page, encode_cursor
+from src.export import stream_ndjson
+from .cache import genre_facet_cache, book_detail_cache
 import uuid
+import time
+import json
+import csv
+import io
 
 access_token = AccessTokenBearer()
 
+# Loader profiles: relationships are never loaded implicitly, so each read
+# names the ones its response actually uses
+BOOK_ONLY = []
+# The rating row is one-to-one, so it rides along on the book query itself
+BOOK_LIST = [joinedload(Book.rating)]
+BOOK_DETAIL = [selectinload(Book.reviews), selectinload(Book.tags), *BOOK_LIST]
+BOOK_WITH_TAGS = [selectinload(Book.tags), *BOOK_LIST]
+
+
+@dataclass
+class GenreFilter:
+    any_of: List[str] = field(default_factory=list)
+    all_of: List[str] = field(default_factory=list)
+
+
+def genre_filter(
+    genre_any: Optional[List[str]] = Query(
+        None, description="Books in at least one of these genres"
+    ),
+    genre_all: Optional[List[str]] = Query(
+        None, description="Books in every one of these genres"
+    ),
+) -> GenreFilter:
+    return GenreFilter(any_of=genre_any or [], all_of=genre_all or [])
+
+
+def filter_genres(statement, genres: GenreFilter):
+    # && and @> on the array are both answered by the GIN index ix_books_genre
+    if genres.any_of:
+        statement = statement.where(Book.Genre.overlap(genres.any_of))
+    if genres.all_of:
+        statement = statement.where(Book.Genre.contains(genres.all_of))
+    return statement
+
+
+# Genre is a single CSV column holding e.g. "Fiction|Historical"
+CSV_GENRE_SEPARATOR = "|"
+
+
+def parse_book_records(body: bytes, content_type: str) -> list:
+    """Split an import body into records by its Content-Type.
+
+    An NDJSON line that is not valid JSON is kept as its error message, so it
+    is reported against its own row instead of failing the whole import.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    try:
+        text_body = body.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Import body is not UTF-8 : {str(e)}",
+        )
+
+    if media_type == "application/json":
+        try:
+            records = json.loads(text_body)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid JSON body : {str(e)}",
+            )
+        if not isinstance(records, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of books",
+            )
+        return records
+
+    if media_type in ("application/x-ndjson", "application/ndjson"):
+        records = []
+        for line in text_body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(f"Invalid JSON line : {str(e)}")
+        return records
+
+    if media_type == "text/csv":
+        records = []
+        for record in csv.DictReader(io.StringIO(text_body)):
+            if record.get("Genre") is not None:
+                record["Genre"] = [
+                    genre.strip()
+                    for genre in record["Genre"].split(CSV_GENRE_SEPARATOR)
+                    if genre.strip()
+                ]
+            records.append(record)
+        return records
+
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Send books as application/json, application/x-ndjson or text/csv",
+    )
+
+
+def import_error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        )
+    return str(e)
+
 
 class BooksService:
-    async def get_all_books(self, session: AsyncSession):
-        statement = select(Book).order_by(desc(Book.created_at))
+    async def get_all_books(
+        self,
+        session: AsyncSession,
+        page: PageParams = PageParams(),
+        genres: GenreFilter = GenreFilter(),
+    ):
+        statement = paginate(
+            filter_genres(select(Book).options(*BOOK_LIST), genres), Book, page
+        )
         result = await session.exec(statement)
-        return result.all()
+        return build_page(result.all(), page)
+
+    async def search_books(
+        self,
+        query: str,
+        session: AsyncSession,
+        page: PageParams = PageParams(),
+        genres: GenreFilter = GenreFilter(),
+    ):
+        """Full-text search over titles and authors, best matches first.
+
+        Matches come off the GIN index on books.search_vector, and title hits
+        outrank author hits. Every match is ranked unless SEARCH_MAX_MATCHES
+        caps them, in which case only the newest that many are, the same ones
+        for every page. Pages are keyed on (rank, uid) of the last result.
+        """
+        ts_query = func.websearch_to_tsquery("english", query)
+        matches = filter_genres(
+            select(Book, BOOK_SEARCH_VECTOR).where(
+                BOOK_SEARCH_VECTOR.op("@@")(ts_query)
+            ),
+            genres,
+        )
+        if settings.SEARCH_MAX_MATCHES:
+            matches = matches.order_by(desc(Book.created_at), desc(Book.uid)).limit(
+                settings.SEARCH_MAX_MATCHES
+            )
+        matches = matches.subquery("matches")
+        match = aliased(Book, matches)
+        rank = func.ts_rank_cd(matches.c.search_vector, ts_query)
+
+        statement = select(match, rank).options(joinedload(match.rating))
+        if page.after is not None:
+            statement = statement.where(tuple_(rank, match.uid) < page.after)
+        statement = statement.order_by(desc(rank), desc(match.uid)).limit(
+            page.limit + 1
+        )
+
+        try:
+            result = await session.exec(statement)
+            rows = result.all()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error searching Books : {str(e)}",
+            )
+
+        items = [book for book, _ in rows[: page.limit]]
+        next_cursor = None
+        if len(rows) > page.limit:
+            last_book, last_rank = rows[page.limit - 1]
+            next_cursor = encode_cursor(last_rank, last_book.uid)
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def fuzzy_books(
+        self,
+        query: str,
+        session: AsyncSession,
+        threshold: float = settings.FUZZY_THRESHOLD_DEFAULT,
+        limit: int = settings.FUZZY_LIMIT_DEFAULT,
+    ):
+        """Typo-tolerant lookup of titles and authors, closest matches first.
+
+        Scores by trigram word similarity, so "Tolstoi" finds "Leo Tolstoy".
+        The %> operator takes its cutoff from pg_trgm.word_similarity_threshold,
+        set for this transaction only. The GiST trigram indexes on Title and
+        Author each hand out their limit closest rows by distance (<->>, one
+        minus the similarity), and a book's score is the better of the two, so
+        however many rows pass the threshold only 2 * limit are read.
+        """
+        term = literal(query, String)
+        nearest = []
+        for column in (Book.Title, Book.Author):
+            distance = column.op("<->>", return_type=Float)(term)
+            nearest.append(
+                select(Book.uid, (1 - distance).label("score"))
+                .where(column.op("%>")(term))
+                .order_by(distance)
+                .limit(limit)
+            )
+        candidates = union_all(*nearest).subquery("candidates")
+        score = func.max(candidates.c.score)
+        best = (
+            select(candidates.c.uid, score.label("score"))
+            .group_by(candidates.c.uid)
+            .subquery("best")
+        )
+
+        statement = (
+            select(Book)
+            .join(best, Book.uid == best.c.uid)
+            .options(*BOOK_LIST)
+            .order_by(desc(best.c.score), desc(Book.uid))
+            .limit(limit)
+        )
 
-    async def get_user_books(self, user_uid: str, session: AsyncSession):
-        print("USER ID : ", user_uid)
         try:
-            statement = (
-                select(Book)
-                .where(Book.user_uid == user_uid)
-                .order_by(desc(Book.created_at))
+            await session.exec(
+                select(
+                    func.set_config(
+                        "pg_trgm.word_similarity_threshold", str(threshold), True
+                    )
+                )
             )
             result = await session.exec(statement)
             return result.all()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error searching Books : {str(e)}",
+            )
+
+    def export_books(self, session_factory):
+        # Unordered, so the export is a plain sequential scan
+        return stream_ndjson(
+            session_factory, select(Book).options(*BOOK_LIST), BookSchema
+        )
+
+    async def get_genre_facets(self, session: AsyncSession):
+        """Number of books in each genre, most common first.
+
+        Counting unnests every book's genres, so the result is cached until
+        the next book write, see src/books/cache.py. Pass a primary session:
+        counts from a replica that has not replayed the write yet would be
+        cached under the generation that write started.
+        """
+        generation = await genre_facet_cache.generation()
+        facets = await genre_facet_cache.get(generation)
+        if facets is not None:
+            return facets
+
+        genres = select(func.unnest(Book.Genre).label("genre")).subquery()
+        count = func.count().label("count")
+        statement = (
+            select(genres.c.genre, count)
+            .group_by(genres.c.genre)
+            .order_by(desc(count), genres.c.genre)
+        )
+        result = await session.exec(statement)
+        facets = [{"genre": genre, "count": count} for genre, count in result]
+        await genre_facet_cache.set(generation, facets)
+        return facets
+
+    async def get_user_books(
+        self,
+        user_uid: str,
+        session: AsyncSession,
+        page: PageParams = PageParams(),
+        genres: GenreFilter = GenreFilter(),
+    ):
+        print("USER ID : ", user_uid)
+        try:
+            statement = paginate(
+                filter_genres(
+                    select(Book).where(Book.user_uid == user_uid).options(*BOOK_LIST),
+                    genres,
+                ),
+                Book,
+                page,
+            )
+            result = await session.exec(statement)
+            return build_page(result.all(), page)
         except Exception as e:
             await session.rollback()
             raise HTTPException(
@@ -35,13 +318,11 @@ class BooksService:
                 detail=f"Error getting User books : {str(e)}",
             )
 
-    async def get_single_book(self, book_id: str, session: AsyncSession):
+    async def get_single_book(
+        self, book_id: str, session: AsyncSession, loaders: list = BOOK_DETAIL
+    ):
         try:
-            statement = (
-                select(Book)
-                .where(Book.uid == book_id)
-                .options(selectinload(Book.reviews))
-            )
+            statement = select(Book).where(Book.uid == book_id).options(*loaders)
             result = await session.exec(statement)
             book = result.first()
 
@@ -52,6 +333,39 @@ class BooksService:
                 detail=f"Error getting Book : {str(e)}",
             )
 
+    async def get_book_detail(self, book_uid: str, session: AsyncSession) -> str:
+        """BookDetailModal JSON for a book, read through book_detail_cache.
+
+        A cached book is served without touching the database. Writes that
+        change what the payload shows invalidate it. Pass a primary session,
+        as whatever a miss reads is cached.
+        """
+        try:
+            # One key per book, however the client spelled the uid
+            book_uid = str(uuid.UUID(book_uid))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Book Not found in Database. Please Search Again",
+            )
+
+        payload = await book_detail_cache.get(book_uid)
+        if payload is not None:
+            return payload
+
+        read_at = time.monotonic()
+        book = await self.get_single_book(book_uid, session)
+        if book is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Book Not found in Database. Please Search Again",
+            )
+        payload = BookDetailModal.model_validate(
+            book, from_attributes=True
+        ).model_dump_json()
+        await book_detail_cache.set([book_uid], payload, read_at)
+        return payload
+
     async def create_book(
         self, book_data: BookCreate, user_uuid: str, session: AsyncSession
     ):
@@ -66,7 +380,6 @@ class BooksService:
             session.add(new_book)
             await session.commit()
             await session.refresh(new_book)
-            return new_book
         except Exception as e:
             await session.rollback()
             raise HTTPException(
@@ -74,11 +387,152 @@ class BooksService:
                 detail=f"Error Creating Book: {str(e)}",
             )
 
+        await genre_facet_cache.invalidate()
+        return new_book
+
+    async def import_books(
+        self, records: list, user_uuid: str, on_conflict: str, session: AsyncSession
+    ) -> BookImportResult:
+        results = [None] * len(records)
+        valid = []
+        for index, record in enumerate(records):
+            try:
+                if isinstance(record, str):
+                    raise ValueError(record)
+                book_data_dict = BookCreate.model_validate(record).model_dump()
+                book_data_dict["Publication_Year"] = datetime.strptime(
+                    book_data_dict["Publication_Year"], "%Y-%m-%d"
+                ).date()
+            except Exception as e:
+                results[index] = BookImportRow(
+                    row=index + 1, status="error", detail=import_error(e)
+                )
+                continue
+            valid.append((index, book_data_dict))
+
+        batch_size = settings.BOOK_IMPORT_BATCH_SIZE
+        for start in range(0, len(valid), batch_size):
+            await self.import_batch(
+                valid[start : start + batch_size],
+                user_uuid,
+                on_conflict,
+                results,
+                session,
+            )
+        if valid:
+            await genre_facet_cache.invalidate()
+
+        counts = {"inserted": 0, "updated": 0, "skipped": 0, "error": 0}
+        for result in results:
+            counts[result.status] += 1
+        return BookImportResult(
+            inserted=counts["inserted"],
+            updated=counts["updated"],
+            skipped=counts["skipped"],
+            failed=counts["error"],
+            rows=results,
+        )
+
+    async def import_batch(
+        self,
+        batch: list,
+        user_uuid: str,
+        on_conflict: str,
+        results: list,
+        session: AsyncSession,
+    ):
+        # One row per (Title, Author) per statement, as ON CONFLICT cannot
+        # touch the same row twice. skip keeps the first, upsert the last.
+        by_key = {}
+        for index, book_data_dict in batch:
+            key = (book_data_dict["Title"], book_data_dict["Author"])
+            previous = by_key.get(key)
+            if previous is None:
+                by_key[key] = index
+            elif on_conflict == "upsert":
+                results[previous] = BookImportRow(
+                    row=previous + 1,
+                    status="skipped",
+                    detail=f"Superseded by row {index + 1}",
+                )
+                by_key[key] = index
+            else:
+                results[index] = BookImportRow(
+                    row=index + 1,
+                    status="skipped",
+                    detail=f"Duplicate of row {previous + 1}",
+                )
+
+        values = dict(batch)
+        now = datetime.now()
+        rows = [
+            {
+                **values[index],
+                "uid": uuid.uuid4(),
+                "user_uid": user_uuid,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index in by_key.values()
+        ]
+        # Rows go as executemany parameters, so the statement compiles once and
+        # SQLAlchemy sends them as multi-row VALUES pages
+        statement = pg_insert(Book)
+        if on_conflict == "upsert":
+            statement = statement.on_conflict_do_update(
+                constraint="unique_title_author",
+                set_={
+                    "Publication_Year": statement.excluded.Publication_Year,
+                    "Genre": statement.excluded.Genre,
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(
+                constraint="unique_title_author"
+            )
+        # xmax is 0 only on a freshly inserted row version
+        statement = statement.returning(
+            Book.uid, Book.Title, Book.Author, literal_column("xmax = 0")
+        )
+
+        try:
+            result = await session.exec(statement, params=rows)
+            written = {
+                (Title, Author): (uid, inserted)
+                for uid, Title, Author, inserted in result
+            }
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            for index in by_key.values():
+                results[index] = BookImportRow(
+                    row=index + 1, status="error", detail=import_error(e)
+                )
+            return
+
+        updated = [str(uid) for uid, inserted in written.values() if not inserted]
+        if updated:
+            await book_detail_cache.invalidate(*updated)
+
+        for key, index in by_key.items():
+            if key in written:
+                uid, inserted = written[key]
+                results[index] = BookImportRow(
+                    row=index + 1,
+                    status="inserted" if inserted else "updated",
+                    uid=uid,
+                )
+            else:
+                results[index] = BookImportRow(
+                    row=index + 1, status="skipped", detail="Book already exists"
+                )
+
     async def update_book(
         self, book_uid: str, update_book: BookUpdate, session: AsyncSession
     ):
         try:
-            book_to_update = await self.get_single_book(book_uid, session)
+            book_to_update = await self.get_single_book(book_uid, session, BOOK_ONLY)
             if book_to_update is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -98,7 +552,6 @@ class BooksService:
                 setattr(book_to_update, key, value)
             await session.commit()
             await session.refresh(book_to_update)
-            return book_to_update
         except Exception as e:
             session.rollback()
             raise HTTPException(
@@ -106,20 +559,40 @@ class BooksService:
                 detail=f"Error updating book: {str(e)}",
             )
 
+        await genre_facet_cache.invalidate()
+        await book_detail_cache.invalidate(str(book_to_update.uid))
+        return book_to_update
+
     async def delete_book(self, book_uid: str, session: AsyncSession):
-        book_to_delete = await self.get_single_book(book_uid, session)
+        book_to_delete = await self.get_single_book(book_uid, session, BOOK_ONLY)
         if book_to_delete is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Book Not found in Database. Please Search Again",
             )
         try:
+            # Tag links go in one statement; reviews cascade in the database
+            result = await session.exec(
+                delete(BookTag)
+                .where(BookTag.book_uid == book_uid)
+                .returning(BookTag.tag_uid)
+            )
+            unlinked = result.scalars().all()
+            if unlinked:
+                await session.exec(
+                    update(Tag)
+                    .where(Tag.uid.in_(unlinked))
+                    .values(book_count=Tag.book_count - 1)
+                )
             await session.delete(book_to_delete)
             await session.commit()
-            return {"detail": "Book deleted successfully"}
         except Exception as e:
             await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail=f"Error deleting book: {str(e)}",
             )
+
+        await genre_facet_cache.invalidate()
+        await book_detail_cache.invalidate(str(book_to_delete.uid))
+        return {"detail": "Book deleted successfully"}
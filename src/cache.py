@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+import logging
+import time
+
+
+class TTLCache:
+    """A small in-process LRU cache whose entries also expire after a TTL.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is reached
+    (``None`` means unbounded), and lazily dropped on access once their TTL
+    has passed.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def purge_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key
+            for key, (_, expires_at) in self._data.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+class TieredCache:
+    """Read-through cache with a per-worker TTLCache and an optional shared
+    Redis tier, for values loaded from the database.
+
+    Invalidations are broadcast on ``channel`` so every worker drops its local
+    copy. A value read before an invalidation this worker has seen is not
+    stored, so a slow read cannot put back what a write just removed. A worker
+    that stored a key in Redis deletes it again when it hears of the
+    invalidation, in case its write landed after the invalidating worker's
+    delete.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        channel: str,
+        maxsize: int,
+        ttl: int,
+        use_redis: bool = False,
+    ):
+        self.prefix = prefix
+        self.channel = channel
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        # When each key was last invalidated, kept as long as an entry can live
+        self.invalidated = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Keys this worker wrote to the Redis tier
+        self.stored = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.use_redis = use_redis
+
+    @property
+    def client(self):
+        # Looked up on use: src.db.redis imports this module
+        from src.db import redis
+
+        return redis.client
+
+    def encode(self, value: Any) -> str:
+        return value
+
+    def decode(self, payload: str) -> Any:
+        return payload
+
+    async def get(self, key: str) -> Any:
+        value = self.local.get(key)
+        if value is not None or not self.use_redis:
+            return value
+
+        payload = await self.client.get(f"{self.prefix}{key}")
+        if payload is None:
+            return None
+        value = self.decode(payload)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, keys: Iterable[str], value: Any, read_at: float):
+        """Store value under every key, unless one was invalidated since
+        ``read_at``, the time.monotonic() taken before the value was read."""
+        keys = list(keys)
+        if any(self.invalidated.get(key, 0.0) >= read_at for key in keys):
+            return
+        for key in keys:
+            self.local.set(key, value)
+        if self.use_redis:
+            # Marked before the first await, so a drop arriving meanwhile
+            # deletes what this write leaves behind
+            for key in keys:
+                self.stored.set(key, True)
+            payload = self.encode(value)
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(f"{self.prefix}{key}", payload, ex=self.ttl)
+                await pipe.execute()
+
+    async def invalidate(self, *keys: str):
+        """Drop keys everywhere. Called once a write has committed, so a Redis
+        failure is logged rather than raised; other workers then serve their
+        copies until the TTL expires them."""
+        self.forget(keys)
+        try:
+            if self.use_redis:
+                await self.client.delete(*[f"{self.prefix}{key}" for key in keys])
+            await self.client.publish(self.channel, " ".join(keys))
+        except Exception as e:
+            cached = " ".join(f"{self.prefix}{key}" for key in keys)
+            logging.warning(f"Error invalidating {cached} : {e!r}")
+
+    def forget(self, keys: Iterable[str]):
+        now = time.monotonic()
+        for key in keys:
+            self.local.pop(key)
+            self.invalidated.set(key, now)
+
+    async def drop(self, message: str):
+        keys = message.split()
+        self.forget(keys)
+        stored = [key for key in keys if self.stored.pop(key) is not None]
+        if stored:
+            await self.client.delete(*[f"{self.prefix}{key}" for key in stored])
+
+    async def resync(self):
+        # Invalidations may have been missed while the subscription was down
+        self.local.clear()
@@ -1,7 +1,10 @@
 from celery import Celery
 from src.mail import create_message, mail
+from src.db.main import Session, engine
+from src.reviews.ratings import rebuild_book_ratings
 from asgiref.sync import async_to_sync
 from pydantic import EmailStr
+from typing import Optional
 import logging
 
 c_app = Celery()
@@ -23,3 +26,21 @@ def send_bg_email(self, recipients: list[EmailStr], subject: str, body: str):
         print("EMAIL SENT")
     except Exception as e:
         logging.warning(f"Error in Sending Background Mail: {str(e)}")
+
+
+async def rebuild_ratings(book_uid: Optional[str] = None) -> int:
+    try:
+        async with Session() as session:
+            rebuilt = await rebuild_book_ratings(session, book_uid)
+            await session.commit()
+            return rebuilt
+    finally:
+        # Pooled connections are tied to this task's event loop
+        await engine.dispose()
+
+
+# Rebuild Book Rating Aggregates from the Reviews table
+@c_app.task
+def rebuild_book_ratings_task(book_uid: Optional[str] = None):
+    rebuilt = async_to_sync(rebuild_ratings)(book_uid)
+    logging.info(f"Rebuilt rating aggregates for {rebuilt} books")
@@ -1,9 +1,20 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 
 class Settings(BaseSettings):
     ROOT_ROUTE: str
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG: float = 5.0  # Seconds of replay lag before reads go to the primary
+    REPLICA_CHECK_INTERVAL: float = 5.0
+    REPLICA_TIMEOUT: float = 1.0  # Seconds a replica connect or health check may take
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
     JWT_PRIVATE: str
     JWT_ALGORITHM: str
     REDIS_URL: str
@@ -25,6 +36,31 @@ class Settings(BaseSettings):
     DANGEROUS_MAX_AGE: int
     DOMAIN: str
     VERSION: str
+    TOKEN_CACHE_SIZE: int = 10000
+    STATELESS_AUTH: bool = False
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_REDIS: bool = False
+    PASSWORD_HASH_ROUNDS: int = (
+        12  # bcrypt cost, see benchmarks/calibrate_password_hash.py
+    )
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # Defaults to the CPU count
+    PASSWORD_HASH_MAX_QUEUE: int = 0  # Waiting hash jobs before shedding; 0 = no limit
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    BOOK_IMPORT_BATCH_SIZE: int = 1000  # Rows per import transaction
+    SEARCH_MAX_MATCHES: int = 5000  # Newest matches ranked per search; 0 = rank all
+    FUZZY_THRESHOLD_DEFAULT: float = 0.6  # Minimum word similarity, 0 to 1
+    FUZZY_LIMIT_DEFAULT: int = 10
+    FUZZY_LIMIT_MAX: int = 50
+    BOOK_CACHE_SIZE: int = 10000  # Book detail payloads kept per worker
+    BOOK_CACHE_TTL: int = 300
+    BOOK_CACHE_REDIS: bool = True
+    GENRE_FACETS_TTL: int = 300  # Seconds genre counts are cached between book writes
+    TAG_SUGGEST_LIMIT_DEFAULT: int = 10
+    TAG_SUGGEST_LIMIT_MAX: int = 50
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor round trip
 
     class Config:
         env_file = ".env"
@@ -1,32 +1,157 @@
 from sqlmodel import create_engine, text, SQLModel
 from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from src.config import settings
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
+from prometheus_client import Gauge, Histogram
+from typing import Optional
+import asyncio
+import logging
+import time
 
-engine = AsyncEngine(
-    create_engine(
-        url = settings.DATABASE_URL,
-        echo= True
+pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+pool_checked_out = Gauge("db_pool_checked_out", "Connections currently checked out")
+pool_overflow = Gauge("db_pool_overflow", "Connections open beyond the pool size")
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - start_time)
+
+
+def build_engine(url: str, connect_timeout: Optional[float] = None) -> AsyncEngine:
+    connect_args = {"timeout": connect_timeout} if connect_timeout is not None else {}
+    return AsyncEngine(
+        create_engine(
+            url=url,
+            connect_args=connect_args,
+            echo=settings.DB_ECHO,
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
     )
+
+
+engine = build_engine(settings.DATABASE_URL)
+replica_engine = (
+    build_engine(settings.DATABASE_REPLICA_URL, settings.REPLICA_TIMEOUT)
+    if settings.DATABASE_REPLICA_URL
+    else None
 )
+
+pool_checked_out.set_function(lambda: engine.pool.checkedout())
+pool_overflow.set_function(lambda: max(engine.pool.overflow(), 0))
+
+# Built once; every request draws its session from these factories
+Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+ReadSession = (
+    sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+# 0 when the replica has replayed everything it received, NULL off a standby
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaHealth:
+    """Caches whether the replica is reachable and within REPLICA_MAX_LAG,
+    re-checking at most once per REPLICA_CHECK_INTERVAL."""
+
+    def __init__(self):
+        self.healthy = False
+        self.next_check = 0.0
+
+    async def available(self) -> bool:
+        if ReadSession is None:
+            return False
+        if time.monotonic() >= self.next_check:
+            self.next_check = time.monotonic() + settings.REPLICA_CHECK_INTERVAL
+            # Requests arriving while the check runs read from the primary
+            self.healthy = False
+            self.healthy = await self.check()
+        return self.healthy
+
+    def mark_unhealthy(self, error: Exception):
+        logging.warning(f"Read replica unavailable, reading from primary : {error!r}")
+        self.healthy = False
+        self.next_check = time.monotonic() + settings.REPLICA_CHECK_INTERVAL
+
+    async def check(self) -> bool:
+        try:
+            lag = await asyncio.wait_for(self.replay_lag(), settings.REPLICA_TIMEOUT)
+        except Exception as e:
+            logging.warning(f"Read replica unavailable, reading from primary : {e!r}")
+            return False
+        if lag is not None and lag > settings.REPLICA_MAX_LAG:
+            logging.warning(f"Read replica {lag:.1f}s behind, reading from primary")
+            return False
+        return True
+
+    async def replay_lag(self) -> Optional[float]:
+        async with replica_engine.connect() as conn:
+            return (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+
+
+replica_health = ReplicaHealth()
+
+
 # Initialize Database
 
+
 async def init_db():
     async with engine.begin() as conn:
         # from src.books.models import Book
 
+        # Trigram operator classes used by the books indexes
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
-# Define New Session Maker
-
 async def get_session():
-    Session= sessionmaker(
-        bind=engine,
-        class_= AsyncSession,
-        expire_on_commit=False
-    )
+    async with Session() as session:
+        yield session
+
+
+# Read-only work; falls back to the primary when the replica is down or lagging
+async def read_session_factory():
+    return ReadSession if await replica_health.available() else Session
+
 
+async def get_read_session():
+    if await replica_health.available():
+        async with ReadSession() as session:
+            try:
+                # Connect up front, so a replica that went down since the last
+                # check is swapped for the primary instead of failing the request
+                await asyncio.wait_for(session.connection(), settings.REPLICA_TIMEOUT)
+            except (OSError, asyncio.TimeoutError, SQLAlchemyError) as e:
+                replica_health.mark_unhealthy(e)
+            else:
+                yield session
+                return
     async with Session() as session:
-        yield session
\ No newline at end of file
+        yield session
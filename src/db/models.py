@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, Column, text, Relationship
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index, Computed
 from sqlalchemy.schema import ForeignKey
 from typing import List, Optional
 from datetime import datetime, date
@@ -13,7 +13,10 @@ class BookTag(SQLModel, table=True):
     book_uid: uuid.UUID = Field(default=None, foreign_key="books.uid", primary_key=True)
     tag_uid: uuid.UUID = Field(default=None, foreign_key="tag.uid", primary_key=True)
 
-    __table_args__ = (UniqueConstraint("book_uid", "tag_uid", name="unique_book_tag"),)
+    __table_args__ = (
+        UniqueConstraint("book_uid", "tag_uid", name="unique_book_tag"),
+        Index("ix_booktag_tag_uid", "tag_uid"),
+    )
 
 
 class Book(SQLModel, table=True):
@@ -31,13 +34,24 @@ class Book(SQLModel, table=True):
     )
     Genre: List[str] = Field(sa_column=Column(pg.ARRAY(pg.VARCHAR), nullable=True))
     user: Optional["User"] = Relationship(back_populates="books")
+    # Not loaded unless a query asks for them, see the loader profiles in
+    # src/books/service.py
     tags: List["Tag"] = Relationship(
         back_populates="books",
         link_model=BookTag,
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
     )
     reviews: List["Review"] = Relationship(
-        back_populates="book", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="book",
+        sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True},
+    )
+    rating: Optional["BookRating"] = Relationship(
+        back_populates="book",
+        sa_relationship_kwargs={
+            "lazy": "raise",
+            "uselist": False,
+            "passive_deletes": True,
+        },
     )
     created_at: datetime = Field(
         sa_column=Column(
@@ -55,12 +69,92 @@ class Book(SQLModel, table=True):
 
     __table_args__ = (
         UniqueConstraint("Title", "Author", "user_uid", name="unique_title_author"),
+        # uid breaks created_at ties for keyset paging, see src/pagination.py
+        Index("ix_books_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+        Index("ix_books_created_at_uid", "created_at", "uid"),
+        # Answers the genre any-of (&&) and all-of (@>) filters
+        Index("ix_books_genre", "Genre", postgresql_using="gin"),
+        # Trigram indexes for typo-tolerant lookup, see BooksService.fuzzy_books.
+        # GiST rather than GIN, as only GiST can return rows nearest first.
+        # Need the pg_trgm extension, which init_db and the migrations create.
+        Index(
+            "ix_books_title_trgm",
+            "Title",
+            postgresql_using="gist",
+            postgresql_ops={"Title": "gist_trgm_ops"},
+        ),
+        Index(
+            "ix_books_author_trgm",
+            "Author",
+            postgresql_using="gist",
+            postgresql_ops={"Author": "gist_trgm_ops"},
+        ),
     )
 
     def __repr__(self) -> str:
         return f"<Book {self.Title} of {self.Author}>"
 
 
+# Full-text search document, maintained by Postgres. Added to the table after
+# mapping, so it is never loaded with a Book and only appears in search
+# queries, see BooksService.search_books.
+BOOK_SEARCH_VECTOR = Column(
+    "search_vector",
+    pg.TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('english', coalesce(\"Title\", '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(\"Author\", '')), 'B')",
+        persisted=True,
+    ),
+)
+Book.__table__.append_column(BOOK_SEARCH_VECTOR)
+Index("ix_books_search_vector", BOOK_SEARCH_VECTOR, postgresql_using="gin")
+
+
+class BookRating(SQLModel, table=True):
+    """Review aggregates for one book, kept in step with its reviews by
+    src/reviews/ratings.py. Books without reviews have no row."""
+
+    __tablename__ = "book_ratings"
+    book_uid: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID,
+            ForeignKey("books.uid", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        )
+    )
+    review_count: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    rating_sum: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    # Histogram of ratings 1 to 5
+    rating_1: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    rating_2: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    rating_3: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    rating_4: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    rating_5: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    last_reviewed_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=True)
+    )
+    book: Optional["Book"] = Relationship(back_populates="rating")
+
+    def __repr__(self) -> str:
+        return f"<BookRating for book {self.book_uid}>"
+
+
 class User(SQLModel, table=True):
     __tablename__ = "users"
     uid: uuid.UUID = Field(
@@ -80,11 +174,12 @@ class User(SQLModel, table=True):
     is_verified: bool = Field(
         sa_column=Column(pg.BOOLEAN, nullable=False, default=False)
     )
+    # Loaded only when a query opts in, e.g. UserService.get_user(load_library=True)
     books: List["Book"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
     )
     reviews: List["Review"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
     )
 
     role: str = Field(
@@ -157,6 +252,13 @@ class Review(SQLModel, table=True):
         )
     )
 
+    __table_args__ = (
+        # Also serves the latest-review lookup in src/reviews/ratings.py
+        Index("ix_reviews_book_uid_created_at", "book_uid", "created_at"),
+        Index("ix_reviews_user_uid", "user_uid"),
+        Index("ix_reviews_created_at_uid", "created_at", "uid"),
+    )
+
     def __repr__(self) -> str:
         return f"<Review for book {self.book_uid} by user {self.user_uid}>"
 
@@ -168,11 +270,28 @@ class Tag(SQLModel, table=True):
         sa_column=Column(pg.UUID, primary_key=True, nullable=False, default=uuid.uuid4)
     )
     name: str = Field(sa_column=Column(pg.VARCHAR(240), nullable=False))
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now)
+    )
+    # Books carrying the tag, kept in step with booktag by TagService and
+    # BooksService.delete_book. Ranks autocomplete suggestions.
+    book_count: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
     books: List["Book"] = Relationship(
         back_populates="tags",
         link_model=BookTag,
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
+    )
+
+    __table_args__ = (
+        # Tag names are unique ignoring case; lookups go through lower(name).
+        # text_pattern_ops lets prefix matches use it whatever the collation.
+        Index("ix_tag_lower_name", text("lower(name) text_pattern_ops"), unique=True),
+        Index("ix_tag_created_at_uid", "created_at", "uid"),
+        # Most used tags first, for short autocomplete prefixes that match
+        # too many tags to rank them all, see TagService.suggest_tags
+        Index("ix_tag_book_count", text("book_count DESC"), text("lower(name)")),
     )
 
     def __repr__(self) -> str:
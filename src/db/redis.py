@@ -1,7 +1,19 @@
 import redis.asyncio as aioredis  # Use asyncio version of Redis
+from typing import Optional
 from src.config import settings
+from src.cache import TTLCache
+import asyncio
+import inspect
+import logging
+import time
 
 JTI_EXPIRY = 3600  # Expiry time in seconds
+USER_VERSION_PREFIX = "user_version:"
+TOKEN_GENERATION_PREFIX = "token_generation:"
+REVOCATION_CHANNEL = "jti_blacklist"
+GENERATION_CHANNEL = "token_generation"
+USER_VERSION_CHANNEL = "user_version"
+JTI_KEY_PATTERN = "????????-????-????-????-????????????"  # Blacklist keys are bare JTIs
 
 # Initialize async Redis client
 
@@ -16,14 +28,199 @@ client = aioredis.Redis(
 # client = aioredis.from_url(settings.REDIS_URL)
 
 
+class RevocationCache:
+    """Worker-local copy of the JTI blacklist, per-user token generations and
+    per-user versions, kept current over Redis pub/sub.
+
+    Only trusted while ``ready``; until the subscriber is running, lookups go
+    to Redis as before.
+    """
+
+    PURGE_INTERVAL = 60
+
+    def __init__(self):
+        self.jtis = TTLCache(maxsize=None, ttl=JTI_EXPIRY)
+        self.generations = {}
+        self.versions = {}
+        self.ready = False
+        self._next_purge = 0.0
+
+    def set_generation(self, user_uid: str, generation: int):
+        if generation > self.generations.get(user_uid, 0):
+            self.generations[user_uid] = generation
+
+    def set_version(self, user_uid: str, version: int):
+        if version > self.versions.get(user_uid, 0):
+            self.versions[user_uid] = version
+
+    def add(self, jti: str, ttl: Optional[float] = None):
+        self.jtis.set(jti, True, ttl=ttl)
+        if time.monotonic() >= self._next_purge:
+            self.jtis.purge_expired()
+            self._next_purge = time.monotonic() + self.PURGE_INTERVAL
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self.jtis
+
+
+revocation_cache = RevocationCache()
+
+
 # Asynchronous function to add JTI to the blacklist with expiry
 async def add_jti_to_blacklist(jti: str):
     await client.set(
         name=jti, value=jti, ex=JTI_EXPIRY
     )  # Use the actual JTI as the key
+    revocation_cache.add(jti)
+    await client.publish(REVOCATION_CHANNEL, jti)
 
 
 # Asynchronous function to check if JTI is in the blacklist
 async def token_in_blacklist(jti: str):
+    if revocation_cache.ready:
+        return jti in revocation_cache
     jti_info = await client.get(jti)  # Fetch the JTI using the JTI as the key
     return jti_info is not None
+
+
+# A user's tokens are valid only while they carry the user's current generation,
+# so one INCR revokes every access and refresh token issued before it
+async def get_token_generation(user_uid: str) -> int:
+    if revocation_cache.ready:
+        return revocation_cache.generations.get(user_uid, 0)
+    return await load_token_generation(user_uid)
+
+
+# Straight from Redis, for tokens being issued: the local mirror may not have
+# seen a revocation made on another worker yet
+async def load_token_generation(user_uid: str) -> int:
+    generation = await client.get(f"{TOKEN_GENERATION_PREFIX}{user_uid}")
+    return int(generation) if generation is not None else 0
+
+
+async def revoke_user_tokens(user_uid: str) -> int:
+    generation = await client.incr(f"{TOKEN_GENERATION_PREFIX}{user_uid}")
+    revocation_cache.set_generation(user_uid, generation)
+    await client.publish(GENERATION_CHANNEL, f"{user_uid}:{generation}")
+    return generation
+
+
+async def token_generation_revoked(user_claims: dict) -> bool:
+    current = await get_token_generation(user_claims["user_uid"])
+    return user_claims.get("generation", 0) < current
+
+
+async def load_revocations():
+    keys = [key async for key in client.scan_iter(match=JTI_KEY_PATTERN, count=1000)]
+    async with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+        ttls = await pipe.execute()
+    for key, ttl in zip(keys, ttls):
+        if ttl > 0:
+            revocation_cache.add(key, ttl=ttl)
+
+    keys = [
+        key
+        async for key in client.scan_iter(
+            match=f"{TOKEN_GENERATION_PREFIX}*", count=1000
+        )
+    ]
+    generations = await client.mget(keys) if keys else []
+    for key, generation in zip(keys, generations):
+        if generation is not None:
+            user_uid = key.removeprefix(TOKEN_GENERATION_PREFIX)
+            revocation_cache.set_generation(user_uid, int(generation))
+
+    keys = [
+        key
+        async for key in client.scan_iter(match=f"{USER_VERSION_PREFIX}*", count=1000)
+    ]
+    versions = await client.mget(keys) if keys else []
+    for key, version in zip(keys, versions):
+        if version is not None:
+            user_uid = key.removeprefix(USER_VERSION_PREFIX)
+            revocation_cache.set_version(user_uid, int(version))
+
+
+def apply_generation(message: str):
+    user_uid, generation = message.rsplit(":", 1)
+    revocation_cache.set_generation(user_uid, int(generation))
+
+
+def apply_version(message: str):
+    user_uid, version = message.rsplit(":", 1)
+    revocation_cache.set_version(user_uid, int(version))
+
+
+# Pub/sub channels every worker follows, mapped to their message handlers
+# (functions or coroutine functions), and the coroutines that reload state
+# whenever the subscription (re)starts
+channel_handlers = {
+    REVOCATION_CHANNEL: revocation_cache.add,
+    GENERATION_CHANNEL: apply_generation,
+    USER_VERSION_CHANNEL: apply_version,
+}
+resync_handlers = [load_revocations]
+
+
+def follow_channel(channel: str, handler, resync=None):
+    channel_handlers[channel] = handler
+    if resync is not None:
+        resync_handlers.append(resync)
+
+
+async def sync_channels(retry_delay: float = 1.0):
+    """Reload worker-local state from Redis, then follow the pub/sub channels."""
+    while True:
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before reloading so nothing published in between is missed
+            await pubsub.subscribe(*channel_handlers)
+            for resync in resync_handlers:
+                await resync()
+            revocation_cache.ready = True
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    handled = channel_handlers[message["channel"]](message["data"])
+                    if inspect.isawaitable(handled):
+                        await handled
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Redis channel sync interrupted : {str(e)}")
+        finally:
+            revocation_cache.ready = False
+            await pubsub.aclose()
+        await asyncio.sleep(retry_delay)
+
+
+# Per-user version stamped into tokens. Seeded from the clock so a flushed key
+# never hands out a version an older token already carries.
+async def get_user_version(user_uid: str) -> Optional[int]:
+    if revocation_cache.ready:
+        return revocation_cache.versions.get(user_uid)
+    version = await client.get(f"{USER_VERSION_PREFIX}{user_uid}")
+    return int(version) if version is not None else None
+
+
+async def publish_user_version(user_uid: str, version: int):
+    revocation_cache.set_version(user_uid, version)
+    await client.publish(USER_VERSION_CHANNEL, f"{user_uid}:{version}")
+
+
+async def ensure_user_version(user_uid: str) -> int:
+    key = f"{USER_VERSION_PREFIX}{user_uid}"
+    created = await client.set(name=key, value=time.time_ns(), nx=True)
+    version = int(await client.get(key))
+    if created:
+        await publish_user_version(user_uid, version)
+    return version
+
+
+async def bump_user_version(user_uid: str) -> int:
+    key = f"{USER_VERSION_PREFIX}{user_uid}"
+    await client.set(name=key, value=time.time_ns(), nx=True)
+    version = await client.incr(key)
+    await publish_user_version(user_uid, version)
+    return version
@@ -0,0 +1,44 @@
+import logging
+from typing import AsyncIterator, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.config import settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def stream_ndjson(
+    factory, statement, schema: Type[BaseModel]
+) -> AsyncIterator[bytes]:
+    """Yield ``statement``'s rows as NDJSON, one batch at a time.
+
+    Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time, so memory
+    stays flat however large the table is. The session is opened here rather
+    than taken from a route dependency, because those are closed before a
+    streaming body is sent.
+    """
+    async with factory() as session:
+        try:
+            result = await session.stream(
+                statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.scalars().partitions():
+                yield "".join(
+                    schema.model_validate(row, from_attributes=True).model_dump_json()
+                    + "\n"
+                    for row in rows
+                ).encode()
+        except Exception as e:
+            # Headers are already sent, so the client sees a truncated body
+            logging.error(f"Export of {schema.__name__} failed : {e}")
+            raise
+
+
+def ndjson_response(stream: AsyncIterator[bytes], name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{name}.ndjson"'},
+    )
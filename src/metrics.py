@@ -0,0 +1,7 @@
+from fastapi import FastAPI
+from prometheus_client import make_asgi_app
+
+
+def register_metrics(app: FastAPI):
+    # Expose every prometheus_client metric registered in the process
+    app.mount("/metrics", make_asgi_app())
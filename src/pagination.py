@@ -0,0 +1,88 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+import json
+import uuid
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+from sqlmodel import desc
+
+from src.config import settings
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+@dataclass
+class PageParams:
+    limit: int = settings.PAGE_SIZE_DEFAULT
+    # (sort key, uid) of the last row on the previous page. The sort key is
+    # created_at for lists and the rank for search results.
+    after: Optional[Tuple[Any, uuid.UUID]] = None
+
+
+def encode_cursor(key, uid) -> str:
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    payload = json.dumps([key, str(uid)])
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, parse_key: Callable = datetime.fromisoformat
+) -> Tuple[Any, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, uid = json.loads(urlsafe_b64decode(padded))
+        return parse_key(key), uuid.UUID(uid)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid page cursor",
+        )
+
+
+def page_params_for(parse_key: Callable) -> Callable:
+    def page_params(
+        cursor: Optional[str] = Query(
+            None, description="next_cursor of the previous page"
+        ),
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    ) -> PageParams:
+        after = decode_cursor(cursor, parse_key) if cursor is not None else None
+        return PageParams(limit=limit, after=after)
+
+    return page_params
+
+
+page_params = page_params_for(datetime.fromisoformat)
+rank_page_params = page_params_for(float)
+
+
+def paginate(statement, model, page: PageParams):
+    """Order newest first on (created_at, uid) and seek past the cursor.
+
+    The row comparison walks a (created_at, uid) index from the cursor, so any
+    page costs the same as the first. One extra row is fetched to tell whether
+    another page follows.
+    """
+    if page.after is not None:
+        statement = statement.where(tuple_(model.created_at, model.uid) < page.after)
+    return statement.order_by(desc(model.created_at), desc(model.uid)).limit(
+        page.limit + 1
+    )
+
+
+def build_page(rows: list, page: PageParams) -> dict:
+    items = rows[: page.limit]
+    next_cursor = None
+    if len(rows) > page.limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].uid)
+    return {"items": items, "next_cursor": next_cursor}
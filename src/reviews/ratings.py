@@ -0,0 +1,103 @@
+from typing import Optional
+from sqlmodel import select, update, delete, func, case, text, exists
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.db.models import BookRating, Review
+
+RATING_VALUES = range(1, 6)
+AGGREGATE_COLUMNS = [
+    "review_count",
+    "rating_sum",
+    *(f"rating_{value}" for value in RATING_VALUES),
+    "last_reviewed_at",
+]
+
+
+async def record_review(review: Review, session: AsyncSession):
+    """Count a newly flushed review in its book's aggregates.
+
+    Runs in the caller's transaction; the upsert takes the aggregate row lock,
+    so concurrent reviews of the same book apply one after another.
+    """
+    histogram_column = f"rating_{review.rating}"
+    statement = pg_insert(BookRating).values(
+        book_uid=review.book_uid,
+        review_count=1,
+        rating_sum=review.rating,
+        last_reviewed_at=review.created_at,
+        **{histogram_column: 1},
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[BookRating.book_uid],
+        set_={
+            "review_count": BookRating.review_count + 1,
+            "rating_sum": BookRating.rating_sum + review.rating,
+            histogram_column: getattr(BookRating, histogram_column) + 1,
+            "last_reviewed_at": func.greatest(
+                BookRating.last_reviewed_at, statement.excluded.last_reviewed_at
+            ),
+        },
+    )
+    await session.exec(statement)
+
+
+async def forget_review(review: Review, session: AsyncSession):
+    """Take a review, already deleted and flushed, out of its book's aggregates."""
+    histogram_column = f"rating_{review.rating}"
+    # Only deleting the latest review needs the next one looked up
+    latest_remaining = (
+        select(func.max(Review.created_at))
+        .where(Review.book_uid == review.book_uid)
+        .scalar_subquery()
+    )
+    statement = (
+        update(BookRating)
+        .where(BookRating.book_uid == review.book_uid)
+        .values(
+            review_count=BookRating.review_count - 1,
+            rating_sum=BookRating.rating_sum - review.rating,
+            last_reviewed_at=case(
+                (BookRating.last_reviewed_at == review.created_at, latest_remaining),
+                else_=BookRating.last_reviewed_at,
+            ),
+            **{histogram_column: getattr(BookRating, histogram_column) - 1},
+        )
+    )
+    await session.exec(statement)
+
+
+async def rebuild_book_ratings(
+    session: AsyncSession, book_uid: Optional[str] = None
+) -> int:
+    """Recompute aggregates from the reviews table, for one book or all.
+
+    Repairs drift, e.g. after reviews were removed by a cascade. Holds a lock
+    that makes concurrent review writes wait until the caller commits, so none
+    of them is lost to the overwrite. Returns the number of rows written.
+    """
+    await session.exec(text("LOCK TABLE book_ratings IN SHARE ROW EXCLUSIVE MODE"))
+
+    totals = select(
+        Review.book_uid,
+        func.count(),
+        func.sum(Review.rating),
+        *(func.count().filter(Review.rating == value) for value in RATING_VALUES),
+        func.max(Review.created_at),
+    ).group_by(Review.book_uid)
+    stale = delete(BookRating).where(
+        ~exists().where(Review.book_uid == BookRating.book_uid)
+    )
+    if book_uid is not None:
+        totals = totals.where(Review.book_uid == book_uid)
+        stale = stale.where(BookRating.book_uid == book_uid)
+
+    statement = pg_insert(BookRating).from_select(
+        ["book_uid", *AGGREGATE_COLUMNS], totals
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[BookRating.book_uid],
+        set_={column: statement.excluded[column] for column in AGGREGATE_COLUMNS},
+    )
+    result = await session.exec(statement)
+    await session.exec(stale)
+    return result.rowcount
@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
-from typing import List
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.auth.dependencies import AccessTokenBearer, RoleChecker, get_current_user
-from src.db.models import User
-from src.db.main import get_session
+from src.auth.dependencies import (
+    access_token_bearer,
+    RoleChecker,
+    Principal,
+    get_principal,
+)
+from src.db.main import get_session, get_read_session, read_session_factory
 from .service import ReviewService
+from src.pagination import Page, PageParams, page_params
+from src.export import ndjson_response
 from .schema import ReviewCreate, ReviewModal
 
 reviews_router = APIRouter()
-access_token_bearer = AccessTokenBearer()
 
 review_service = ReviewService()
 
@@ -25,9 +29,9 @@ async def add_book_review(
     book_uid: str,
     review_data: ReviewCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_principal),
 ):
-    user_email = current_user.email
+    user_email = principal.email
 
     new_review = await review_service.add_review_to_book(
         user_email, book_uid, review_data, session
@@ -36,26 +40,34 @@ async def add_book_review(
     return new_review
 
 
+# Declared before /{review_uid} so "export" is not taken for a review uid
+@reviews_router.get("/export", dependencies=[admin_checker])
+async def export_reviews(token_data: dict = Depends(access_token_bearer)):
+    session_factory = await read_session_factory()
+    return ndjson_response(review_service.export_reviews(session_factory), "reviews")
+
+
 @reviews_router.get(
     "/{review_uid}", dependencies=[all_user_checker], response_model=ReviewModal
 )
 async def get_review_by_uid(
     review_uid: str,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+    principal: Principal = Depends(get_principal),
 ):
-    user_uid = current_user.uid
+    user_uid = principal.user_uid
 
     get_review = await review_service.get_review_by_uid(review_uid, user_uid, session)
     return get_review
 
 
-@reviews_router.get("/", dependencies=[admin_checker], response_model=List[ReviewModal])
+@reviews_router.get("/", dependencies=[admin_checker], response_model=Page[ReviewModal])
 async def get_all_reviews(
-    session: AsyncSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_read_session),
     token_data: dict = Depends(access_token_bearer),
 ):
-    get_all_reviews = await review_service.get_all_reviews(session)
+    get_all_reviews = await review_service.get_all_reviews(session, page)
     return get_all_reviews
 
 
@@ -1,13 +1,17 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
-from src.db.models import Review, User
-from sqlmodel import select, update, delete, desc
+from src.db.models import Review
+from sqlmodel import select, update, delete
 from src.auth.service import UserService
-from src.books.service import BooksService
+from src.books.service import BooksService, BOOK_ONLY
+from src.books.cache import book_detail_cache
 from src.auth.dependencies import AccessTokenBearer
 from src.auth.schema import UserBookModal
+from src.pagination import PageParams, paginate, build_page
+from src.export import stream_ndjson
 from pydantic import EmailStr
-from .schema import ReviewCreate
+from .schema import ReviewCreate, ReviewModal
+from .ratings import record_review, forget_review
 
 user_service = UserService()
 book_service = BooksService()
@@ -22,8 +26,8 @@ class ReviewService:
         session: AsyncSession,
     ):
         try:
-            book_data = await book_service.get_single_book(book_uid, session)
-            user_data = await user_service.get_user(user_email, session)
+            book_data = await book_service.get_single_book(book_uid, session, BOOK_ONLY)
+            user_data = await user_service.get_auth_user(user_email, session)
 
             if not book_data:
                 raise HTTPException(
@@ -38,11 +42,12 @@ class ReviewService:
             review_data_dict["user_uid"] = user_data.uid
             review_data_dict["book_uid"] = book_data.uid
             new_review = Review(**review_data_dict)
-            new_review.book = book_data
-            new_review.user = user_data
 
             session.add(new_review)
+            await session.flush()
+            await record_review(new_review, session)
             await session.commit()
+            await book_detail_cache.invalidate(str(book_data.uid))
             return new_review
         except Exception as e:
             await session.rollback()
@@ -55,7 +60,7 @@ class ReviewService:
         self, review_uid: str, user_uid: str, session: AsyncSession
     ):
         try:
-            user_data: User = await user_service.get_user_by_uid(user_uid, session)
+            user_data = await user_service.get_auth_user_by_uid(user_uid, session)
             statement = (
                 select(Review)
                 .where(Review.uid == review_uid)
@@ -75,17 +80,12 @@ class ReviewService:
             )
 
     async def get_all_reviews(
-        self, session: AsyncSession, limit: int = 100, offset: int = 0
+        self, session: AsyncSession, page: PageParams = PageParams()
     ):
         try:
-            statement = (
-                select(Review)
-                .order_by(desc(Review.created_at))
-                .limit(limit)
-                .offset(offset)
-            )
+            statement = paginate(select(Review), Review, page)
             result = await session.exec(statement)
-            return result.all()
+            return build_page(result.all(), page)
         except Exception as e:
             await session.rollback()
             raise HTTPException(
@@ -93,6 +93,9 @@ class ReviewService:
                 detail=f"Error getting review: {str(e)}",
             )
 
+    def export_reviews(self, session_factory):
+        return stream_ndjson(session_factory, select(Review), ReviewModal)
+
     async def delete_user_review(
         self, review_uid: str, user_uid: str, session: AsyncSession
     ):
@@ -107,7 +110,10 @@ class ReviewService:
                 )
 
             await session.delete(review_to_delete)
+            await session.flush()
+            await forget_review(review_to_delete, session)
             await session.commit()
+            await book_detail_cache.invalidate(str(review_to_delete.book_uid))
             return {"detail": "Review deleted successfully"}
 
         except Exception as e:
@@ -1,31 +1,56 @@
-from fastapi import APIRouter, Depends, dependencies, HTTPException, status
-from .schemas import TagAddModal, TagCreateModal, TagModal
+from fastapi import APIRouter, Depends, dependencies, HTTPException, status, Query
+from .schemas import TagAddModal, TagCreateModal, TagModal, TagSuggestionModal
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_read_session, read_session_factory
 from src.books.schemas import BookTags
 from .service import TagService
-from src.auth.dependencies import AccessTokenBearer, get_current_user, RoleChecker
+from src.auth.dependencies import access_token_bearer, get_current_user, RoleChecker
+from src.pagination import Page, PageParams, page_params
+from src.export import ndjson_response
+from src.config import settings
 from typing import List
 from fastapi.responses import JSONResponse
 
 tag_router = APIRouter()
 tag_service = TagService()
-access_token_bearer = AccessTokenBearer()
 
 admin_checker = Depends(RoleChecker(["admin"]))
 user_checker = Depends(RoleChecker(["user"]))
 user_admin_checker = Depends(RoleChecker(["user", "admin"]))
 
 
-@tag_router.get("/", response_model=List[TagModal], dependencies=[admin_checker])
+@tag_router.get("/", response_model=Page[TagModal], dependencies=[admin_checker])
 async def get_all_tags(
-    session: AsyncSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_read_session),
     token_data: dict = Depends(access_token_bearer),
 ):
-    all_tags = await tag_service.get_all_tags(session)
+    all_tags = await tag_service.get_all_tags(session, page)
     return all_tags
 
 
+@tag_router.get("/export", dependencies=[admin_checker])
+async def export_tags(token_data: dict = Depends(access_token_bearer)):
+    session_factory = await read_session_factory()
+    return ndjson_response(tag_service.export_tags(session_factory), "tags")
+
+
+@tag_router.get(
+    "/suggest",
+    response_model=List[TagSuggestionModal],
+    dependencies=[user_admin_checker],
+)
+async def suggest_tags(
+    prefix: str = Query(..., min_length=1, max_length=240),
+    limit: int = Query(
+        settings.TAG_SUGGEST_LIMIT_DEFAULT, ge=1, le=settings.TAG_SUGGEST_LIMIT_MAX
+    ),
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(access_token_bearer),
+):
+    return await tag_service.suggest_tags(prefix, session, limit)
+
+
 @tag_router.post("/add", response_model=TagModal, dependencies=[user_admin_checker])
 async def add_tag(
     tag_data: TagCreateModal, session: AsyncSession = Depends(get_session)
@@ -10,6 +10,12 @@ class TagModal(BaseModel):
     created_at: datetime
 
 
+class TagSuggestionModal(BaseModel):
+    uid: uuid.UUID
+    name: str
+    book_count: int
+
+
 class TagCreateModal(BaseModel):
     name: str
 
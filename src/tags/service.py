@@ -1,22 +1,35 @@
 from .schemas import TagModal, TagCreateModal, TagAddModal
-from src.db.models import Tag
-from src.books.service import BooksService
+from src.db.models import Tag, BookTag
+from src.books.service import BooksService, BOOK_ONLY, BOOK_WITH_TAGS
+from src.books.cache import book_detail_cache
 from fastapi import HTTPException, status, Depends
 from fastapi.responses import JSONResponse
-from sqlmodel import select, desc, delete
+from sqlmodel import select, desc, delete, update, func, text
 from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime
+import uuid
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.pagination import PageParams, paginate, build_page
+from src.export import stream_ndjson
+from src.config import settings
 
 book_service = BooksService()
 
+# Tag names are matched ignoring case, against the unique ix_tag_lower_name
+TAG_KEY = func.lower(Tag.name)
+TAG_CONFLICT_TARGET = [text("lower(name)")]
+
 
 class TagService:
-    async def get_all_tags(self, session: AsyncSession):
+    async def get_all_tags(
+        self, session: AsyncSession, page: PageParams = PageParams()
+    ):
         try:
-            # Fetch all tags ordered by creation date descending
-            statement = select(Tag).order_by(desc(Tag.created_at))
+            # Fetch one page of tags, newest first
+            statement = paginate(select(Tag), Tag, page)
             result = await session.exec(statement)
-            return result.all()
+            return build_page(result.all(), page)
 
         except Exception as e:
             # Rollback transaction on error and raise HTTPException
@@ -26,9 +39,12 @@ class TagService:
                 detail=f"Error getting Tag List: {str(e)}",
             )
 
+    def export_tags(self, session_factory):
+        return stream_ndjson(session_factory, select(Tag), TagModal)
+
     async def get_single_tag(self, tag_name: str, session: AsyncSession):
         try:
-            statement = select(Tag).where(Tag.name == tag_name)
+            statement = select(Tag).where(TAG_KEY == func.lower(tag_name))
             result = await session.exec(statement)
             if not result:
                 raise HTTPException(
@@ -43,11 +59,44 @@ class TagService:
                 detail=f"Error getting Tag: {str(e)}",
             )
 
+    async def suggest_tags(
+        self,
+        prefix: str,
+        session: AsyncSession,
+        limit: int = settings.TAG_SUGGEST_LIMIT_DEFAULT,
+    ):
+        """Tags whose name starts with prefix, ignoring case, most used first.
+
+        A selective prefix is a range scan of ix_tag_lower_name, ranking only
+        the tags in that range. A short one matches so many tags that walking
+        ix_tag_book_count until enough of them match is cheaper, and the
+        planner picks between the two from the prefix.
+        """
+        try:
+            # A cached generic plan would make that choice once for every
+            # prefix, so plan each lookup for the prefix it was given
+            await session.exec(
+                select(func.set_config("plan_cache_mode", "force_custom_plan", True))
+            )
+            statement = (
+                select(Tag)
+                .where(TAG_KEY.startswith(prefix.lower(), autoescape=True))
+                .order_by(desc(Tag.book_count), TAG_KEY)
+                .limit(limit)
+            )
+            result = await session.exec(statement)
+            return result.all()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error suggesting Tags: {str(e)}",
+            )
+
     async def add_tag_to_book(
         self, tag_list: TagAddModal, book_uid: str, session: AsyncSession
     ):
         try:
-            book = await book_service.get_single_book(book_uid, session)
+            book = await book_service.get_single_book(book_uid, session, BOOK_ONLY)
             print("<----BOOK INFO---->", book)
             if not book:
                 raise HTTPException(
@@ -55,19 +104,31 @@ class TagService:
                     detail=f"Book with UID {book_uid} not found.",
                 )
 
-            for tag_info in tag_list.tags:
-                statement = select(Tag).where(Tag.name == tag_info.name)
-                result = await session.exec(statement)
-                tag_data = result.one_or_none()
-                if not tag_data:
-                    tag_data = Tag(name=tag_info.name)
-                    session.add(tag_data)
-                book.tags.append(tag_data)
-
-            session.add(book)
+            names = [tag_info.name for tag_info in tag_list.tags]
+            if names:
+                tag_uids = await self.resolve_tag_uids(names, session)
+                result = await session.exec(
+                    pg_insert(BookTag)
+                    .on_conflict_do_nothing()
+                    .returning(BookTag.tag_uid),
+                    params=[
+                        {"book_uid": book.uid, "tag_uid": tag_uid}
+                        for tag_uid in tag_uids.values()
+                    ],
+                )
+                # Only links that did not exist yet are counted
+                linked = result.scalars().all()
+                if linked:
+                    await session.exec(
+                        update(Tag)
+                        .where(Tag.uid.in_(linked))
+                        .values(book_count=Tag.book_count + 1)
+                    )
             await session.commit()
-            await session.refresh(book)
-            return book
+            await book_detail_cache.invalidate(str(book.uid))
+
+            # book.tags was never loaded, so this fills it in on the same object
+            return await book_service.get_single_book(book_uid, session, BOOK_WITH_TAGS)
 
         except Exception as e:
             await session.rollback()
@@ -76,6 +137,46 @@ class TagService:
                 detail=f"Error getting Tag List: {str(e)}",
             )
 
+    async def resolve_tag_uids(self, names: list, session: AsyncSession) -> dict:
+        """Map lower-cased tag names to uids, creating the missing tags.
+
+        One lookup and at most one insert, however many names are given. A new
+        tag keeps the spelling it was first given in.
+        """
+        spellings = {}
+        for name in names:
+            spellings.setdefault(name.lower(), name)
+
+        result = await session.exec(
+            select(TAG_KEY, Tag.uid).where(TAG_KEY.in_(list(spellings)))
+        )
+        tag_uids = dict(result.all())
+
+        # Sorted, so concurrent batches take the unique index locks in the
+        # same order and cannot deadlock
+        missing = sorted(key for key in spellings if key not in tag_uids)
+        if missing:
+            now = datetime.now()
+            result = await session.exec(
+                pg_insert(Tag)
+                .on_conflict_do_nothing(index_elements=TAG_CONFLICT_TARGET)
+                .returning(TAG_KEY, Tag.uid),
+                params=[
+                    {"uid": uuid.uuid4(), "name": spellings[key], "created_at": now}
+                    for key in missing
+                ],
+            )
+            tag_uids.update(result.all())
+
+            # Created by a concurrent request between the lookup and the insert
+            raced = [key for key in missing if key not in tag_uids]
+            if raced:
+                result = await session.exec(
+                    select(TAG_KEY, Tag.uid).where(TAG_KEY.in_(raced))
+                )
+                tag_uids.update(result.all())
+        return tag_uids
+
     async def get_tag_by_uid(self, tag_id: str, session: AsyncSession):
         try:
             statement = select(Tag).where(Tag.uid == tag_id)
@@ -95,20 +196,22 @@ class TagService:
 
     async def add_tag(self, tag_data: TagCreateModal, session: AsyncSession):
         try:
-            # Check if the tag already exists
-            existing_tag = await self.get_single_tag(tag_data.name, session)
-            if existing_tag:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Tag with name {tag_data.name} already exists.",
+            # One statement returns the new tag or the existing one. The no-op
+            # DO UPDATE (rather than DO NOTHING) is what makes RETURNING yield
+            # the existing row, including one a concurrent request just added.
+            statement = (
+                pg_insert(Tag)
+                .values(name=tag_data.name)
+                .on_conflict_do_update(
+                    index_elements=TAG_CONFLICT_TARGET, set_={"name": Tag.name}
                 )
-
-            # Create and add a new tag if not existing
-            new_tag = Tag(name=tag_data.name)
-            session.add(new_tag)
+                .returning(Tag)
+                .execution_options(populate_existing=True)
+            )
+            result = await session.exec(statement)
+            tag = result.scalar_one()
             await session.commit()
-            await session.refresh(new_tag)
-            return new_tag
+            return tag
 
         except Exception as e:
             await session.rollback()
@@ -122,29 +225,34 @@ class TagService:
     ):
         try:
             tag_info = await self.get_tag_by_uid(tag_id, session)
+            # Cached book details embed the tag's name
+            book_uids = await self.tagged_book_uids(tag_info.uid, session)
             tag_update_dict = tag_update_info.model_dump()
             for key, value in tag_update_dict.items():
                 setattr(tag_info, key, value)
             await session.commit()
             await session.refresh(tag_info)
-            return tag_info
         except Exception as e:
             await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_406_NOT_ACCEPTABLE,
                 detail=f"Error Updating Tag : {str(e)}",
             )
+        if book_uids:
+            await book_detail_cache.invalidate(*book_uids)
+        return tag_info
 
     async def delete_tag(self, tag_id: str, session: AsyncSession):
         try:
             tag_info = await self.get_tag_by_uid(tag_id, session)
+            result = await session.exec(
+                delete(BookTag)
+                .where(BookTag.tag_uid == tag_info.uid)
+                .returning(BookTag.book_uid)
+            )
+            book_uids = [str(uid) for uid in result.scalars().all()]
             await session.delete(tag_info)
             await session.commit()
-            return JSONResponse(
-                content={"message": f"Tag '{tag_info.name}' deleted successfully"},
-                status_code=status.HTTP_202_ACCEPTED,
-                media_type="application/json",
-            )
 
         except Exception as e:
             await session.rollback()
@@ -152,3 +260,16 @@ class TagService:
                 status_code=status.HTTP_406_NOT_ACCEPTABLE,
                 detail=f"Error Deleting Tag : {str(e)}",
             )
+        if book_uids:
+            await book_detail_cache.invalidate(*book_uids)
+        return JSONResponse(
+            content={"message": f"Tag '{tag_info.name}' deleted successfully"},
+            status_code=status.HTTP_202_ACCEPTED,
+            media_type="application/json",
+        )
+
+    async def tagged_book_uids(self, tag_uid, session: AsyncSession) -> list:
+        result = await session.exec(
+            select(BookTag.book_uid).where(BookTag.tag_uid == tag_uid)
+        )
+        return [str(uid) for uid in result.all()]